@@ -4,18 +4,38 @@ INSTRUCTION HEADER
 What this file does (plain English):
 - Exports the public API of the platform.config subpackage so callers only
   need a single import line, e.g. `from platform.config import load_snapshot`.
-- Re-exports four things:
+- Re-exports:
     HEADERS              — dict mapping each Excel sheet name to its column list
     load_snapshot        — load the JSON config snapshot into a Python dict
+    load_snapshot_header — check a snapshot's sheet names without loading rows
+    rows_as_records      — row dicts from one layout="rows" snapshot sheet
     export_snapshot      — read run_config.xlsx and write it out as a JSON snapshot
     read_sheets_as_records — read every sheet of the xlsx into a list of dicts
+    read_sheets_as_columns — read every sheet of the xlsx into per-column lists
+    read_sheets_as_views — read every sheet of the xlsx as tuple-backed SheetViews
+    SheetView            — one sheet's row tuples with by-name column access
 
 Where it runs: Imported by tools and data modules. Never run directly.
 """
 
 from .schema import HEADERS
-from .load_snapshot import load_snapshot
+from .load_snapshot import load_snapshot, load_snapshot_header, rows_as_records
 from .export_snapshot import export_snapshot
-from .excel_io import read_sheets_as_records
+from .excel_io import (
+    SheetView,
+    read_sheets_as_columns,
+    read_sheets_as_records,
+    read_sheets_as_views,
+)
 
-__all__ = ["HEADERS", "load_snapshot", "export_snapshot", "read_sheets_as_records"]
+__all__ = [
+    "HEADERS",
+    "load_snapshot",
+    "load_snapshot_header",
+    "rows_as_records",
+    "export_snapshot",
+    "read_sheets_as_records",
+    "read_sheets_as_columns",
+    "read_sheets_as_views",
+    "SheetView",
+]
@@ -4,49 +4,179 @@ INSTRUCTION HEADER
 What this file does (plain English):
 - Reads run_config.xlsx and returns each sheet as a list of row dicts, one
   dict per data row (header row excluded), skipping any blank rows.
-- Uses HEADERS from schema.py to know which columns to read and in what order,
-  so the result is always keyed by column name rather than by position.
+- Uses HEADERS from schema.py (via its frozen HEADERS_TUPLE form) to know which
+  columns to read and in what order, so the result is always keyed by column
+  name rather than by position.
 - Main export: read_sheets_as_records(xlsx_path) -> dict[sheet_name, list[dict]]
+- Tuple-backed variant: read_sheets_as_views(xlsx_path) -> dict[sheet_name, SheetView].
+  A SheetView keeps the rows as tuples with one header -> index map per sheet;
+  view["col"] plucks a column, view.records() builds the row dicts on demand
+  using the per-sheet generated builders from schema_codegen.py.
+- Column-oriented variant: read_sheets_as_columns(xlsx_path)
+  -> dict[sheet_name, dict[column_name, list]] (one list per column, no per-row dicts).
+- Uses python-calamine (Rust xlsx reader) when installed and falls back to
+  openpyxl read-only mode otherwise. calamine cells are normalized to what
+  openpyxl returns (whole floats -> int, dates -> midnight datetime, "" -> None)
+  so both paths produce identical records. calamine only sees cached formula
+  results, so a workbook containing formulas is read with openpyxl, which
+  returns the formula text.
+- The parsed workbook is memoized per (path, mtime, size) as immutable row
+  tuples; each call builds fresh dicts, so callers can mutate their result.
 
 Where it runs: Imported by export_snapshot.py. Never run directly as a script.
 Inputs:  Path to run_config.xlsx.
-Outputs: Dict mapping sheet name -> list of {column_name: value} dicts.
+Outputs: Dict mapping sheet name -> list of {column_name: value} dicts
+         (or {column_name: [values...]} for read_sheets_as_columns).
 """
 
 from __future__ import annotations
 
+from functools import lru_cache
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterator
 
-from openpyxl import load_workbook
+from .schema import HEADERS_TUPLE
+from .schema_codegen import ROW_BUILDERS, RowBuilder
+from .xlsx_cells import calamine_cell, has_formulas
 
-from .schema import HEADERS
 
+def _is_blank_row(values: tuple[Any, ...]) -> bool:
+    # any() stops at the first non-blank cell; most data rows exit on cell 0.
+    return not any(v is not None and (not isinstance(v, str) or v.strip()) for v in values)
 
-def _is_blank_row(values: list[Any]) -> bool:
-    for v in values:
-        if v is None:
-            continue
-        if isinstance(v, str) and v.strip() == "":
-            continue
-        return False
-    return True
 
+def _read_rows_calamine(path_str: str) -> dict[str, tuple[tuple[Any, ...], ...]]:
+    from python_calamine import CalamineWorkbook
 
-def read_sheets_as_records(xlsx_path: str | Path) -> dict[str, list[dict[str, Any]]]:
-    xlsx_path = Path(xlsx_path)
-    wb = load_workbook(xlsx_path)
-    data: dict[str, list[dict[str, Any]]] = {}
-
-    for sheet_name, headers in HEADERS.items():
-        if sheet_name not in wb.sheetnames:
+    wb = CalamineWorkbook.from_path(path_str)
+    data: dict[str, tuple[tuple[Any, ...], ...]] = {}
+    for sheet_name, _headers, width in HEADERS_TUPLE:
+        if sheet_name not in wb.sheet_names:
             raise ValueError(f"Missing sheet: {sheet_name}")
-        ws = wb[sheet_name]
-        rows: list[dict[str, Any]] = []
-        for row in ws.iter_rows(min_row=2, max_row=ws.max_row, values_only=True):
-            if _is_blank_row(list(row)):
+        # skip_empty_area=False keeps row 0 as the header row even when the
+        # sheet's used range starts further down or right.
+        raw = wb.get_sheet_by_name(sheet_name).to_python(skip_empty_area=False)
+        rows: list[tuple[Any, ...]] = []
+        for raw_row in raw[1:]:
+            row = tuple(calamine_cell(v) for v in raw_row[:width])
+            if _is_blank_row(row):
                 continue
-            record = {headers[i]: row[i] if i < len(row) else None for i in range(len(headers))}
-            rows.append(record)
-        data[sheet_name] = rows
+            rows.append(row + (None,) * (width - len(row)))
+        data[sheet_name] = tuple(rows)
+    return data
+
+
+def _read_rows_openpyxl(path_str: str) -> dict[str, tuple[tuple[Any, ...], ...]]:
+    # Imported here so that importing platform.config (e.g. just to call
+    # load_snapshot) does not pay for loading openpyxl.
+    from openpyxl import load_workbook
+
+    # read_only streams each sheet's XML instead of building the full cell graph.
+    # Formula cells keep their formula text, as with a full load_workbook.
+    wb = load_workbook(path_str, read_only=True, keep_links=False)
+    data: dict[str, tuple[tuple[Any, ...], ...]] = {}
+
+    try:
+        for sheet_name, _headers, width in HEADERS_TUPLE:
+            if sheet_name not in wb.sheetnames:
+                raise ValueError(f"Missing sheet: {sheet_name}")
+            ws = wb[sheet_name]
+            # max_col pads/truncates every row to exactly `width` values,
+            # so rows need no per-cell bounds check.
+            data[sheet_name] = tuple(
+                row
+                for row in ws.iter_rows(min_row=2, max_col=width, values_only=True)
+                if not _is_blank_row(row)
+            )
+    finally:
+        # Read-only workbooks keep the zip archive open until closed.
+        wb.close()
     return data
+
+
+@lru_cache(maxsize=32)
+def _read_sheet_rows(
+    path_str: str, mtime_ns: int, size: int
+) -> dict[str, tuple[tuple[Any, ...], ...]]:
+    """Parse every HEADERS sheet into header-width value tuples (blank rows dropped).
+
+    mtime_ns/size are cache keys only. Tuples are immutable, so cached entries
+    are safe to share between callers.
+    """
+    if has_formulas(path_str):
+        return _read_rows_openpyxl(path_str)
+    try:
+        return _read_rows_calamine(path_str)
+    except ImportError:
+        return _read_rows_openpyxl(path_str)
+
+
+class SheetView:
+    """Read-only rows of one sheet: value tuples plus a shared header -> index map."""
+
+    __slots__ = ("headers", "rows", "_index", "_build")
+
+    def __init__(
+        self,
+        headers: tuple[str, ...],
+        rows: tuple[tuple[Any, ...], ...],
+        row_builder: RowBuilder | None = None,
+    ) -> None:
+        self.headers = headers
+        self.rows = rows
+        self._index = {h: i for i, h in enumerate(headers)}
+        self._build = row_builder
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __iter__(self) -> Iterator[tuple[Any, ...]]:
+        return iter(self.rows)
+
+    def __getitem__(self, col_name: str) -> list[Any]:
+        """All values of one column, in row order."""
+        i = self._index[col_name]
+        return [row[i] for row in self.rows]
+
+    def index(self, col_name: str) -> int:
+        """Position of col_name within each row tuple."""
+        return self._index[col_name]
+
+    def records(self) -> list[dict[str, Any]]:
+        """Rows as fresh {column_name: value} dicts."""
+        if self._build is not None:
+            return list(map(self._build, self.rows))
+        return [dict(zip(self.headers, row)) for row in self.rows]
+
+
+def read_sheets_as_views(xlsx_path: str | Path) -> dict[str, SheetView]:
+    xlsx_path = Path(xlsx_path).resolve()
+    st = xlsx_path.stat()
+    sheet_rows = _read_sheet_rows(str(xlsx_path), st.st_mtime_ns, st.st_size)
+    # Cached rows are immutable tuples, so views share them without copying.
+    return {
+        sheet_name: SheetView(headers, sheet_rows[sheet_name], ROW_BUILDERS[sheet_name])
+        for sheet_name, headers, _n in HEADERS_TUPLE
+    }
+
+
+def read_sheets_as_records(xlsx_path: str | Path) -> dict[str, list[dict[str, Any]]]:
+    return {
+        sheet_name: view.records()
+        for sheet_name, view in read_sheets_as_views(xlsx_path).items()
+    }
+
+
+def read_sheets_as_columns(xlsx_path: str | Path) -> dict[str, dict[str, list[Any]]]:
+    """Same data as read_sheets_as_records, laid out as one value list per column."""
+    xlsx_path = Path(xlsx_path).resolve()
+    st = xlsx_path.stat()
+    sheet_rows = _read_sheet_rows(str(xlsx_path), st.st_mtime_ns, st.st_size)
+    out: dict[str, dict[str, list[Any]]] = {}
+    for sheet_name, headers, _n in HEADERS_TUPLE:
+        rows = sheet_rows[sheet_name]
+        if rows:
+            out[sheet_name] = {h: list(col) for h, col in zip(headers, zip(*rows))}
+        else:
+            out[sheet_name] = {h: [] for h in headers}
+    return out
@@ -7,50 +7,147 @@ What this file does (plain English):
 - The snapshot is what downstream code actually reads at runtime — data loaders,
   the backtest engine, and Jupyter notebooks all call load_snapshot() on this
   file rather than opening the live Excel workbook directly.
-- Stamps the output with an exported_at timestamp and the source xlsx path for
-  traceability.
-- Main export: export_snapshot(xlsx_path, output_path) -> Path
+- Stamps the output with an exported_at UTC timestamp (e.g.
+  "2024-01-02T03:04:05Z") and the source xlsx path for traceability.
+- Writes through a buffered file handle one sheet at a time, so only a single
+  sheet's serialized bytes are held in memory; the file is byte-identical to
+  dumping the whole payload at once.
+- Writes to "<name>.tmp" and renames it over the destination (os.replace), so
+  readers never see a half-written snapshot if the export dies mid-write.
+- Output is compact JSON by default; pass pretty=True for 2-space indentation
+  (larger and slower to write and read, but readable in a diff).
+- format="msgpack" writes the same payload as MessagePack (via ormsgpack)
+  instead, plus a small <name>.meta.json sidecar holding exported_at,
+  source_xlsx, format and schema so the snapshot can be identified without
+  decoding it. load_snapshot picks the format from the file suffix.
+- layout="rows" stores each sheet as {"columns": [...], "rows": [[...], ...]}
+  instead of one dict per row, so column names are written once per sheet rather
+  than once per cell (smaller file, fewer strings to parse). The payload gets
+  "layout": "rows"; load_snapshot turns these sheets back into row dicts.
+- Main export: export_snapshot(xlsx_path, output_path, pretty=False, format="json",
+  layout="records") -> Path
 
 Where it runs: Called by tools/admin/export_config_snapshot.py (the CLI
   wrapper that re-exports after every config change). Never run directly.
 Inputs:  xlsx_path — path to run_config.xlsx.
          output_path — destination for the JSON snapshot file.
-Outputs: JSON file written to output_path; returns the output Path.
+         pretty — indent the JSON output (default False).
+         format — "json" (default) or "msgpack" (needs `pip install ormsgpack`).
+         layout — "records" (default, one dict per row) or "rows" (columns + row lists).
+Outputs: Snapshot file written to output_path (plus the .meta.json sidecar for
+         msgpack); returns the output Path.
 """
 
 from __future__ import annotations
 
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Any, Callable
+from typing import Any, BinaryIO, Iterator
 import datetime as dt
+import os
 
-from .excel_io import read_sheets_as_records
+import orjson
+
+from .excel_io import read_sheets_as_records, read_sheets_as_views
 from .schema import HEADERS
 
 
-def _get_json_dumps() -> Callable[[Any], bytes]:
+_OPTS = orjson.OPT_OMIT_MICROSECONDS | orjson.OPT_UTC_Z
+_PRETTY_OPTS = _OPTS | orjson.OPT_INDENT_2
+
+
+@contextmanager
+def _atomic_write(path: Path) -> Iterator[BinaryIO]:
+    """Open a buffered temp file next to path; rename it over path on success."""
+    tmp_path = path.with_name(path.name + ".tmp")
     try:
-        import orjson
+        with open(tmp_path, "wb", buffering=1024 * 1024) as f:
+            yield f
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
+def _nested(value: Any, depth: int, pretty: bool) -> bytes:
+    if not pretty:
+        return orjson.dumps(value, option=_OPTS)
+    # orjson indents from column 0; shift continuation lines to the nesting
+    # depth. Raw newlines never occur inside JSON strings (they are escaped).
+    return orjson.dumps(value, option=_PRETTY_OPTS).replace(b"\n", b"\n" + b"  " * depth)
 
-        return lambda obj: orjson.dumps(obj, option=orjson.OPT_INDENT_2)
-    except Exception:
-        import json
 
-        return lambda obj: json.dumps(obj, indent=2).encode("utf-8")
+def _write_payload(f: BinaryIO, payload: dict[str, Any], pretty: bool = False) -> None:
+    """Write payload as JSON (indented if pretty), serializing each sheet separately."""
+    nl1, nl2 = (b"\n  ", b"\n    ") if pretty else (b"", b"")
+    colon = b": " if pretty else b":"
+    f.write(b"{")
+    for i, (key, value) in enumerate(payload.items()):
+        f.write(b"," + nl1 if i else nl1)
+        f.write(orjson.dumps(key) + colon)
+        if key != "sheets" or not value:
+            f.write(_nested(value, 1, pretty))
+            continue
+        f.write(b"{")
+        for j, (sheet_name, rows) in enumerate(value.items()):
+            f.write(b"," + nl2 if j else nl2)
+            f.write(orjson.dumps(sheet_name) + colon)
+            f.write(_nested(rows, 2, pretty))
+        f.write(b"\n  }" if pretty else b"}")
+    f.write(b"\n}" if pretty and payload else b"}")
 
 
-def export_snapshot(xlsx_path: str | Path, output_path: str | Path) -> Path:
+def _write_msgpack(output_path: Path, payload: dict[str, Any]) -> None:
+    import ormsgpack
+
+    with _atomic_write(output_path) as f:
+        f.write(
+            ormsgpack.packb(payload, option=ormsgpack.OPT_OMIT_MICROSECONDS | ormsgpack.OPT_UTC_Z)
+        )
+
+    meta = {k: v for k, v in payload.items() if k != "sheets"}
+    meta["format"] = "msgpack"
+    with _atomic_write(output_path.with_suffix(".meta.json")) as f:
+        f.write(orjson.dumps(meta, option=_PRETTY_OPTS))
+
+
+def export_snapshot(
+    xlsx_path: str | Path,
+    output_path: str | Path,
+    pretty: bool = False,
+    format: str = "json",
+    layout: str = "records",
+) -> Path:
+    if format not in ("json", "msgpack"):
+        raise ValueError(f"Unknown snapshot format: {format!r} (expected 'json' or 'msgpack')")
+    if layout not in ("records", "rows"):
+        raise ValueError(f"Unknown snapshot layout: {layout!r} (expected 'records' or 'rows')")
     xlsx_path = Path(xlsx_path)
     output_path = Path(output_path)
     output_path.parent.mkdir(parents=True, exist_ok=True)
 
     payload = {
-        "exported_at": dt.datetime.now().isoformat(timespec="seconds"),
+        # orjson writes datetimes natively; OMIT_MICROSECONDS keeps the old
+        # second-resolution stamp without a Python-side isoformat() call and
+        # UTC_Z renders the UTC offset as "Z".
+        "exported_at": dt.datetime.now(tz=dt.timezone.utc),
         "source_xlsx": str(xlsx_path),
         "schema": HEADERS,
-        "sheets": read_sheets_as_records(xlsx_path),
     }
+    if layout == "rows":
+        # Row tuples serialize as JSON arrays / msgpack arrays as they are.
+        payload["layout"] = "rows"
+        payload["sheets"] = {
+            name: {"columns": view.headers, "rows": view.rows}
+            for name, view in read_sheets_as_views(xlsx_path).items()
+        }
+    else:
+        payload["sheets"] = read_sheets_as_records(xlsx_path)
+
+    if format == "msgpack":
+        _write_msgpack(output_path, payload)
+        return output_path
 
-    dumps = _get_json_dumps()
-    output_path.write_bytes(dumps(payload))
+    with _atomic_write(output_path) as f:
+        _write_payload(f, payload, pretty)
     return output_path
@@ -6,44 +6,188 @@ What this file does (plain English):
 - Validates that all expected sheets (as defined in HEADERS) are present in the
   snapshot before returning, so callers get a clear error if the snapshot is
   stale or incomplete rather than a cryptic KeyError later.
-- Uses orjson for speed if available, falls back to stdlib json automatically.
-- Main export: load_snapshot(json_path) -> dict
+- Parses with orjson straight from the file's UTF-8 bytes (no str decode),
+  memory-mapped so the file is never copied into a separate bytes object.
+- Memoizes the parsed snapshot per (path, mtime, size), so repeated loads in one
+  process skip the read + parse; each call still gets its own copy to mutate.
+- Also reads MessagePack snapshots (export_snapshot(..., format="msgpack")):
+  the format follows the file suffix (.msgpack/.mpk) unless given explicitly.
+- Also reads layout="rows" snapshots (sheets stored as {"columns", "rows"}):
+  they are turned back into row dicts at load (and the "layout" key dropped), so
+  callers always get the usual list-of-dicts sheets. rows_as_records(sheet) does
+  the same for one raw sheet.
+- Main export: load_snapshot(json_path, format=None) -> dict
+- Also: load_snapshot_header(json_path) -> list of sheet names. Checks the same
+  sheets without building any row dicts (streams with ijson when installed;
+  reads the .meta.json sidecar for MessagePack snapshots).
 
 Where it runs: Imported by data modules (e.g. big_trades.py) and Jupyter
   notebooks that need the config at runtime. Never run directly as a script.
 Inputs:  json_path — path to config_snapshot_latest.json (or any snapshot file).
 Outputs: Dict with keys: exported_at, source_xlsx, schema, sheets.
 Common failures + fixes:
-  - "Snapshot missing sheet": re-export via tools/admin/export_config_snapshot.py.
+  - "Snapshot missing sheets: [...]": re-export via tools/admin/export_config_snapshot.py.
   - File not found: run export_config_snapshot.py first to generate the snapshot.
+  - No module named 'ormsgpack': `pip install ormsgpack` (MessagePack snapshots only).
 """
 
 from __future__ import annotations
 
+import mmap
+from functools import lru_cache
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterable
+
+import orjson
 
 from .schema import HEADERS
 
 
-def _json_loads(raw: bytes) -> Any:
-    try:
-        import orjson
-        return orjson.loads(raw)
-    except ImportError:
-        import json
-        return json.loads(raw)
+_MSGPACK_SUFFIXES = (".msgpack", ".mpk")
+
+
+def _resolve_format(json_path: Path, format: str | None) -> str:
+    if format is None:
+        return "msgpack" if json_path.suffix.lower() in _MSGPACK_SUFFIXES else "json"
+    if format not in ("json", "msgpack"):
+        raise ValueError(f"Unknown snapshot format: {format!r} (expected 'json' or 'msgpack')")
+    return format
+
+
+def _decode(raw: bytes | memoryview, format: str) -> Any:
+    if format == "msgpack":
+        import ormsgpack
+
+        return ormsgpack.unpackb(raw)
+    return orjson.loads(raw)
+
+
+def _decode_file(path: Path, format: str) -> Any:
+    """Decode a snapshot file through a read-only mmap (parsers read the page cache)."""
+    with open(path, "rb") as f:
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files cannot be mapped; let the parser raise its usual error.
+            return _decode(b"", format)
+        with mm:
+            view = memoryview(mm)
+            try:
+                return _decode(view, format)
+            finally:
+                view.release()
+
+
+def rows_as_records(sheet: dict[str, Any]) -> list[dict[str, Any]]:
+    """Row dicts from one layout="rows" sheet: {"columns": [...], "rows": [[...], ...]}."""
+    columns = sheet["columns"]
+    return [dict(zip(columns, row)) for row in sheet["rows"]]
+
+
+def _check_sheet_names(sheet_names: Iterable[str]) -> None:
+    # One set difference reports every missing sheet at once.
+    missing = HEADERS.keys() - set(sheet_names)
+    if missing:
+        raise ValueError(f"Snapshot missing sheets: {sorted(missing)}")
+
 
+def _scan_sheet_names(json_path: Path) -> list[str] | None:
+    """Collect the keys of the top-level "sheets" object using ijson events.
 
-def load_snapshot(json_path: str | Path) -> dict[str, Any]:
+    Row values are tokenized but never turned into Python dicts/lists, so
+    memory stays flat regardless of how many rows the snapshot holds.
+    Returns None if "sheets" is missing or is not an object.
+    """
+    import ijson
+
+    names: list[str] | None = None
+    with open(json_path, "rb") as f:
+        for prefix, event, value in ijson.parse(f):
+            if prefix != "sheets":
+                continue
+            if event == "start_map":
+                names = []
+            elif event == "map_key" and names is not None:
+                names.append(value)
+            elif event == "end_map":
+                break
+            elif event != "map_key":
+                return None
+    return names
+
+
+def load_snapshot_header(json_path: str | Path, format: str | None = None) -> list[str]:
+    """Validate the snapshot's sheet names without materializing any rows.
+
+    Use this when only schema verification is needed. Falls back to a full
+    orjson parse when ijson is not installed (`pip install ijson`). For
+    MessagePack snapshots the schema in the .meta.json sidecar is used.
+    """
     json_path = Path(json_path)
-    data = _json_loads(json_path.read_bytes())
+    fmt = _resolve_format(json_path, format)
+    meta_path = json_path.with_suffix(".meta.json")
+    if fmt == "msgpack" and meta_path.exists():
+        schema = orjson.loads(meta_path.read_bytes()).get("schema")
+        names = list(schema) if isinstance(schema, dict) else None
+    elif fmt == "msgpack":
+        sheets = _decode_file(json_path, fmt).get("sheets")
+        names = list(sheets) if isinstance(sheets, dict) else None
+    else:
+        try:
+            names = _scan_sheet_names(json_path)
+        except ImportError:
+            data = _decode_file(json_path, fmt)
+            sheets = data.get("sheets") if isinstance(data, dict) else None
+            names = list(sheets) if isinstance(sheets, dict) else None
+
+    if names is None:
+        raise ValueError("Snapshot missing 'sheets' dict.")
+    _check_sheet_names(names)
+    return names
+
+
+@lru_cache(maxsize=32)
+def _load_snapshot_cached(
+    path_str: str, mtime_ns: int, size: int, format: str
+) -> dict[str, Any]:
+    """Read + parse + validate one snapshot version. mtime_ns/size are cache keys only."""
+    data = _decode_file(Path(path_str), format)
 
     if "sheets" not in data or not isinstance(data["sheets"], dict):
         raise ValueError("Snapshot missing 'sheets' dict.")
 
-    for sheet_name in HEADERS.keys():
-        if sheet_name not in data["sheets"]:
-            raise ValueError(f"Snapshot missing sheet: {sheet_name}")
+    # The dict is already parsed here, so validate it in place rather than
+    # re-reading the file through load_snapshot_header().
+    _check_sheet_names(data["sheets"].keys())
 
+    # layout="rows" sheets become row dicts once here, so the cached copy and
+    # every caller see the same shape as a records snapshot (which has no
+    # "layout" key, so the flag goes too).
+    data["sheets"] = {
+        name: rows_as_records(sheet) if isinstance(sheet, dict) else sheet
+        for name, sheet in data["sheets"].items()
+    }
+    data.pop("layout", None)
     return data
+
+
+def _copy_snapshot(data: dict[str, Any]) -> dict[str, Any]:
+    # Sheet cells and schema entries are JSON scalars, so copying the
+    # containers is equivalent to a deep copy (and much cheaper).
+    out = dict(data)
+    if isinstance(data.get("schema"), dict):
+        out["schema"] = {k: list(v) for k, v in data["schema"].items()}
+    out["sheets"] = {
+        name: [dict(r) for r in rows] if isinstance(rows, list) else rows
+        for name, rows in data["sheets"].items()
+    }
+    return out
+
+
+def load_snapshot(json_path: str | Path, format: str | None = None) -> dict[str, Any]:
+    json_path = Path(json_path).resolve()
+    fmt = _resolve_format(json_path, format)
+    st = json_path.stat()
+    return _copy_snapshot(
+        _load_snapshot_cached(str(json_path), st.st_mtime_ns, st.st_size, fmt)
+    )
@@ -9,6 +9,8 @@ What this file does (plain English):
   and in what order.
 - When a new column is added to the workbook (via a migrate_*.py script or
   manually), the matching list here must be updated to keep the schema in sync.
+- Also defines HEADERS_TUPLE: the same schema frozen at import as
+  (sheet_name, column_tuple, column_count) entries, for the xlsx readers.
 - Used by: excel_io.py (reading), export_snapshot.py (schema embedding),
   load_snapshot.py (validation), and all tools/admin/*.py scripts.
 
@@ -256,3 +258,9 @@ HEADERS = {
         "notes",
     ],
 }
+
+# Frozen (sheet_name, columns, n_columns) view of HEADERS, built once at import
+# so the readers iterate plain tuples instead of dict items + len() per sheet.
+HEADERS_TUPLE: tuple[tuple[str, tuple[str, ...], int], ...] = tuple(
+    (name, tuple(cols), len(cols)) for name, cols in HEADERS.items()
+)
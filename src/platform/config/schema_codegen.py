@@ -0,0 +1,41 @@
+"""
+INSTRUCTION HEADER
+
+What this file does (plain English):
+- Generates one small row -> dict function per sheet in HEADERS, once at
+  import time. Each function is straight-line code with the column names
+  written in as constants, e.g. for RUNBOOK:
+      def _build_RUNBOOK(row):
+          return {'StepNo': row[0], 'Task': row[1], ...}
+  which builds a record faster than a generic dict(zip(headers, row)).
+- Main export: ROW_BUILDERS — dict mapping sheet name -> row builder.
+- Rows passed in must be exactly header width (excel_io guarantees this).
+
+Where it runs: Imported by excel_io.py. Never run directly as a script.
+Inputs:  HEADERS from schema.py.
+Outputs: ROW_BUILDERS dict.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Callable, Sequence
+
+from .schema import HEADERS_TUPLE
+
+
+RowBuilder = Callable[[Sequence[Any]], dict[str, Any]]
+
+
+def _make_row_builder(sheet_name: str, columns: tuple[str, ...]) -> RowBuilder:
+    # repr() quotes/escapes the column names, so any header text is a valid literal.
+    items = ", ".join(f"{col!r}: row[{i}]" for i, col in enumerate(columns))
+    func_name = "_build_" + "".join(c if c.isalnum() else "_" for c in sheet_name)
+    src = f"def {func_name}(row):\n    return {{{items}}}\n"
+    namespace: dict[str, Any] = {}
+    exec(compile(src, f"<row builder {sheet_name}>", "exec"), namespace)
+    return namespace[func_name]
+
+
+ROW_BUILDERS: dict[str, RowBuilder] = {
+    name: _make_row_builder(name, columns) for name, columns, _n in HEADERS_TUPLE
+}
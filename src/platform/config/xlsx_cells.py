@@ -0,0 +1,52 @@
+"""
+INSTRUCTION HEADER
+
+What this file does (plain English):
+- Holds the two small xlsx helpers that the python-calamine readers share:
+    calamine_cell(v)  — maps a calamine cell to the value openpyxl returns
+                        (whole floats -> int, "" -> None, dates -> midnight datetime)
+    has_formulas(path) — True if any worksheet in the xlsx stores a formula.
+                        calamine only sees cached formula results, so callers
+                        read such workbooks with openpyxl (formula text) instead.
+- Standard library only and no package-relative imports, so tools can load it
+  by file path (tools/admin/export_config_snapshot.py does) and keep exactly
+  the same rules as excel_io.py.
+
+Where it runs: Imported by excel_io.py; loaded by path from tools/admin.
+  Never run directly as a script.
+Inputs:  A calamine cell value, or a path to an .xlsx file.
+Outputs: The normalized value, or a bool.
+"""
+
+from __future__ import annotations
+
+import datetime as dt
+from pathlib import Path
+import re
+from typing import Any
+import zipfile
+
+
+# A <f> element in a worksheet part means the cell holds a formula.
+_FORMULA_TAG = re.compile(rb"<(?:\w+:)?f[\s>/]")
+
+
+def calamine_cell(v: Any) -> Any:
+    """Map a calamine cell to the value openpyxl would have returned."""
+    if isinstance(v, float):
+        return int(v) if v.is_integer() else v
+    if v == "":
+        return None
+    if type(v) is dt.date:
+        return dt.datetime.combine(v, dt.time())
+    return v
+
+
+def has_formulas(xlsx_path: str | Path) -> bool:
+    """True if any worksheet in the xlsx stores a formula (a <f> element)."""
+    with zipfile.ZipFile(xlsx_path) as zf:
+        return any(
+            _FORMULA_TAG.search(zf.read(name))
+            for name in zf.namelist()
+            if name.startswith("xl/worksheets/") and name.endswith(".xml")
+        )
@@ -2,6 +2,7 @@
 INSTRUCTION HEADER
 Package: backtest.data — on-the-fly market data computation modules.
 """
+from ._bigtrades_kernels import rolling_percentile_nearest
 from .big_trades import get_big_trades
 
-__all__ = ["get_big_trades"]
+__all__ = ["get_big_trades", "rolling_percentile_nearest"]
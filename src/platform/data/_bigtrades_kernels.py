@@ -0,0 +1,106 @@
+"""
+INSTRUCTION HEADER
+
+What this file does (plain English):
+- Array kernels for post-processing get_big_trades output in a notebook, e.g. a
+  per-symbol rolling size percentile:
+      df["cutoff"] = df.groupby("symbol")["size"].transform(
+          lambda s: rolling_percentile_nearest(s.to_numpy(), 500, 99.0))
+- rolling_percentile_nearest is JIT-compiled with numba (a sliding sorted window,
+  parallel over chunks of the array) when numba is installed; otherwise a chunked
+  NumPy np.partition version gives the same result. numba is optional and only
+  imported on the first call.
+
+Where it runs: Imported by platform.data (re-exported there). Not a script.
+Inputs:  1-D numeric arrays.
+Outputs: float64 arrays, NaN where the window is not yet full.
+"""
+
+from __future__ import annotations
+
+from typing import Callable
+
+import numpy as np
+
+# Rows of the (windows x window) block sorted at once by the NumPy fallback;
+# bounds its temporary copy to about 32 MB of float64.
+_NUMPY_BLOCK_ELEMS = 4_000_000
+
+# Bound to numba.prange before the loop below is compiled; plain range otherwise.
+prange = range
+
+_kernel: Callable[[np.ndarray, int, int, np.ndarray], None] | None = None
+
+
+def _rolling_nearest_loop(
+    arr: np.ndarray, window: int, rank: int, out: np.ndarray, n_chunks: int,
+) -> None:
+    # Each chunk of output positions keeps its own sorted copy of the window
+    # and slides it: drop the outgoing value, insert the incoming one
+    # (binary search + shift), so a step costs O(window) moves, not a sort.
+    first = window - 1
+    per = (arr.size - first + n_chunks - 1) // n_chunks
+    for c in prange(n_chunks):
+        lo = first + c * per
+        hi = min(lo + per, arr.size)
+        if lo >= hi:
+            continue
+        buf = np.sort(arr[lo - first : lo + 1])
+        out[lo] = buf[rank]
+        for i in range(lo + 1, hi):
+            j = np.searchsorted(buf, arr[i - window])
+            k = np.searchsorted(buf, arr[i])
+            if k <= j:
+                for m in range(j, k, -1):
+                    buf[m] = buf[m - 1]
+                buf[k] = arr[i]
+            else:
+                for m in range(j, k - 1):
+                    buf[m] = buf[m + 1]
+                buf[k - 1] = arr[i]
+            out[i] = buf[rank]
+
+
+def _rolling_nearest_numpy(arr: np.ndarray, window: int, rank: int, out: np.ndarray) -> None:
+    windows = np.lib.stride_tricks.sliding_window_view(arr, window)
+    step = max(1, _NUMPY_BLOCK_ELEMS // window)
+    for start in range(0, len(windows), step):
+        block = np.partition(windows[start : start + step], rank, axis=1)
+        out[window - 1 + start : window - 1 + start + len(block)] = block[:, rank]
+
+
+def _resolve_kernel() -> Callable[[np.ndarray, int, int, np.ndarray], None]:
+    global _kernel, prange
+    if _kernel is None:
+        try:
+            import numba
+        except ImportError:
+            _kernel = _rolling_nearest_numpy
+        else:
+            prange = numba.prange
+            jitted = numba.njit(cache=True, parallel=True)(_rolling_nearest_loop)
+
+            def _kernel(arr, window, rank, out):
+                jitted(arr, window, rank, out, numba.get_num_threads())
+
+    return _kernel
+
+
+def rolling_percentile_nearest(arr, window: int, pct: float) -> np.ndarray:
+    """
+    Trailing-window percentile by nearest rank (no interpolation).
+
+    out[i] is the value at 0-based rank floor(pct/100 * (window - 1)) of the
+    sorted arr[i - window + 1 : i + 1]; the first window - 1 entries are NaN.
+    NaNs in arr sort last, as in np.sort.
+    """
+    if window < 1:
+        raise ValueError(f"window must be >= 1, got {window}")
+    if not 0.0 <= pct <= 100.0:
+        raise ValueError(f"pct must be in [0, 100], got {pct}")
+    values = np.ascontiguousarray(arr, dtype=np.float64)
+    out = np.full(values.size, np.nan)
+    if values.size >= window:
+        rank = int(np.floor((pct / 100.0) * (window - 1)))
+        _resolve_kernel()(values, window, rank, out)
+    return out
@@ -30,8 +30,8 @@ Public API:
     # df columns: ts_event, symbol, price, size, side
     #   ts_event : datetime[us, UTC]
     #   symbol   : str   (e.g. "ESH5")
-    #   price    : float
-    #   size     : int   (contracts)
+    #   price    : float32
+    #   size     : int32 (contracts)
     #   side     : str   "B"=buy/green  "S"=sell/red  "N"=neutral/grey
 
 Threshold methods (set via DATASETS columns for each dataset):
@@ -41,11 +41,26 @@ Threshold methods (set via DATASETS columns for each dataset):
     rolling_pct  → threshold = percentile(threshold_pct) over a lookback window
                    threshold_window_days calendar days before start_date are loaded
                    to compute the distribution; only events within [start_date,
-                   end_date] are returned.
+                   end_date] are returned. The percentile is computed on a uniform
+                   200,000-event reservoir sample of the window (exact when the
+                   window is smaller), which bounds the sort on long windows.
 
     z_score      → threshold = mean + threshold_z * stddev over the lookback window
                    same window_days approach as rolling_pct
 
+    When every lookback date has a per-date size histogram newer than its
+    partition (written by tools/build/build_big_trades_stats.py to
+    {canonical root}/stats/{session}/{date}.parquet), the lookback statistics
+    are merged from those sidecars instead of scanning the lookback parquet.
+    Statistics from the sidecars are exact (no reservoir sample).
+
+    Otherwise the lookback is scanned and the statistics (percentile /
+    mean + stddev) are cached as small JSON files under
+    {DATA_ROOT}/cache/big_trades_thresholds/, keyed by dataset root, session,
+    method, window, start_date and the exact lookback dates on disk. Repeat
+    calls skip the lookback scan; deleting that folder is always safe. Only
+    scan results are cached, so sidecars built later take over on the next call.
+
 Source mode (set in INSTRUMENTS.big_trades_source_mode):
 
     real_only        → only real trades (big_trades_dataset_id)
@@ -59,12 +74,16 @@ Source mode (set in INSTRUMENTS.big_trades_source_mode):
 from __future__ import annotations
 
 import datetime as dt
+import hashlib
 import json
+import math
 import os
+import threading
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable
 
 import duckdb
+import orjson
 import pandas as pd
 
 # ---------------------------------------------------------------------------
@@ -72,7 +91,41 @@ import pandas as pd
 # ---------------------------------------------------------------------------
 
 SESSIONS = ("FULL", "RTH")
+# rolling_pct estimates its percentile from a uniform sample of this many
+# lookback events (exact when the window holds fewer).
+_PCT_SAMPLE_ROWS = 200_000
 SNAPSHOT_PATH = Path("config/exports/config_snapshot_latest.json")
+# Result columns are narrowed only at the output: ES/NQ prices (multiples of
+# 0.25, far below 2**22) are exact in float32 and contract counts fit int32.
+# Event SQL and threshold statistics still work in DOUBLE / BIGINT.
+_OUT_COLS = "CAST(price AS FLOAT) AS price, CAST(size AS INTEGER) AS size"
+
+
+# ---------------------------------------------------------------------------
+# Shared DuckDB connection
+# ---------------------------------------------------------------------------
+
+_CON: duckdb.DuckDBPyConnection | None = None
+_CON_LOCK = threading.Lock()
+
+
+def _get_con() -> duckdb.DuckDBPyConnection:
+    """
+    Process-wide in-memory DuckDB connection, created on first use.
+
+    Callers take a cursor() per query batch: cursors are independent query
+    contexts but share the database instance, so Parquet footers/metadata
+    cached by one call are reused by the next.
+    """
+    global _CON
+    with _CON_LOCK:
+        if _CON is None:
+            con = duckdb.connect()  # in-memory; no file needed
+            con.execute("SET GLOBAL parquet_metadata_cache = true")
+            # Return ts_event as UTC regardless of the machine's local zone.
+            con.execute("SET GLOBAL TimeZone = 'UTC'")
+            _CON = con
+        return _CON
 
 
 # ---------------------------------------------------------------------------
@@ -80,45 +133,110 @@ SNAPSHOT_PATH = Path("config/exports/config_snapshot_latest.json")
 # for standalone use in Jupyter; can also call load_snapshot from config)
 # ---------------------------------------------------------------------------
 
+# (resolved path, mtime_ns, size) -> parsed snapshot. Holds at most one entry;
+# a re-export changes mtime/size and replaces it. Callers only read from it.
+_SNAPSHOT_CACHE: dict[tuple[str, int, int], dict[str, Any]] = {}
+
+
+def _index_snapshot(snapshot: dict[str, Any]) -> dict[str, Any]:
+    """
+    Build the "_ix" lookup tables used by the helpers below:
+    DATASETS / INSTRUMENTS by id, and the active PATHS row (None if none).
+    First row wins on duplicate ids, matching the linear scans.
+    THRESHOLDS starts empty and memoizes _get_threshold_config per dataset_id.
+    """
+    sheets = snapshot.get("sheets", {})
+    datasets: dict[Any, dict[str, Any]] = {}
+    for r in sheets.get("DATASETS", []) or []:
+        datasets.setdefault(r.get("dataset_id"), r)
+    instruments: dict[Any, dict[str, Any]] = {}
+    for r in sheets.get("INSTRUMENTS", []) or []:
+        instruments.setdefault(r.get("instrument_id"), r)
+    paths_active = next(
+        (r for r in sheets.get("PATHS", []) or [] if _is_active(r.get("IsActive"))),
+        None,
+    )
+    return {
+        "DATASETS": datasets,
+        "INSTRUMENTS": instruments,
+        "PATHS_ACTIVE": paths_active,
+        "THRESHOLDS": {},
+    }
+
+
 def _load_snapshot_if_needed(snapshot: dict[str, Any] | None) -> dict[str, Any]:
     if snapshot is not None:
         return snapshot
-    if not SNAPSHOT_PATH.exists():
+    try:
+        st = SNAPSHOT_PATH.stat()
+    except FileNotFoundError:
         raise FileNotFoundError(
             f"Config snapshot not found: {SNAPSHOT_PATH}. "
             "Run tools/admin/export_config_snapshot.py first."
-        )
-    try:
-        import orjson
-        return orjson.loads(SNAPSHOT_PATH.read_bytes())
-    except ImportError:
-        return json.loads(SNAPSHOT_PATH.read_text(encoding="utf-8"))
+        ) from None
+    key = (str(SNAPSHOT_PATH.resolve()), st.st_mtime_ns, st.st_size)
+    cached = _SNAPSHOT_CACHE.get(key)
+    if cached is not None:
+        return cached
+    data = orjson.loads(SNAPSHOT_PATH.read_bytes())
+    if data.get("layout") == "rows":
+        # export_snapshot(..., layout="rows"): {"columns", "rows"} per sheet.
+        data["sheets"] = {
+            name: [dict(zip(sheet["columns"], row)) for row in sheet["rows"]]
+            for name, sheet in data["sheets"].items()
+        }
+        del data["layout"]
+    data["_ix"] = _index_snapshot(data)
+    _SNAPSHOT_CACHE.clear()
+    _SNAPSHOT_CACHE[key] = data
+    return data
+
+
+def _is_active(val: Any) -> bool:
+    if isinstance(val, bool):
+        return val
+    if isinstance(val, (int, float)):
+        return bool(val)
+    if isinstance(val, str):
+        return val.strip().lower() in {"1", "true", "yes", "y"}
+    return False
 
 
 def _active_paths(snapshot: dict[str, Any]) -> dict[str, Any]:
-    rows = snapshot.get("sheets", {}).get("PATHS", []) or []
-    for r in rows:
-        val = r.get("IsActive")
-        if isinstance(val, bool) and val:
-            return r
-        if isinstance(val, (int, float)) and val:
-            return r
-        if isinstance(val, str) and val.strip().lower() in {"1", "true", "yes", "y"}:
-            return r
-    raise ValueError("No active PATHS row in config snapshot.")
+    ix = snapshot.get("_ix")
+    if ix is not None:
+        row = ix["PATHS_ACTIVE"]
+    else:
+        rows = snapshot.get("sheets", {}).get("PATHS", []) or []
+        row = next((r for r in rows if _is_active(r.get("IsActive"))), None)
+    if row is None:
+        raise ValueError("No active PATHS row in config snapshot.")
+    return row
 
 
 def _find_dataset_by_id(snapshot: dict[str, Any], dataset_id: str) -> dict[str, Any]:
-    for r in snapshot.get("sheets", {}).get("DATASETS", []) or []:
-        if r.get("dataset_id") == dataset_id:
-            return r
+    ix = snapshot.get("_ix")
+    if ix is not None:
+        row = ix["DATASETS"].get(dataset_id)
+        if row is not None:
+            return row
+    else:
+        for r in snapshot.get("sheets", {}).get("DATASETS", []) or []:
+            if r.get("dataset_id") == dataset_id:
+                return r
     raise ValueError(f"Dataset not found in snapshot: {dataset_id!r}")
 
 
 def _find_instrument(snapshot: dict[str, Any], instrument_id: str) -> dict[str, Any]:
-    for r in snapshot.get("sheets", {}).get("INSTRUMENTS", []) or []:
-        if r.get("instrument_id") == instrument_id:
-            return r
+    ix = snapshot.get("_ix")
+    if ix is not None:
+        row = ix["INSTRUMENTS"].get(instrument_id)
+        if row is not None:
+            return row
+    else:
+        for r in snapshot.get("sheets", {}).get("INSTRUMENTS", []) or []:
+            if r.get("instrument_id") == instrument_id:
+                return r
     raise ValueError(f"Instrument not found in snapshot: {instrument_id!r}")
 
 
@@ -133,10 +251,16 @@ def _parse_notes(notes: str | None) -> dict[str, str]:
     return out
 
 
-def _get_threshold_config(ds: dict[str, Any]) -> dict[str, Any]:
+def _get_threshold_config(
+    ds: dict[str, Any], snapshot: dict[str, Any] | None = None,
+) -> dict[str, Any]:
     """
     Read threshold configuration from a DATASETS row.
 
+    When snapshot is an indexed one (from _load_snapshot_if_needed), the
+    result is memoized in snapshot["_ix"] by dataset_id, so repeat calls
+    for the same dataset skip the parse. Callers only read from it.
+
     Reads from dedicated columns (threshold_method, threshold_min_size,
     threshold_pct, threshold_z, threshold_window_days) first; falls back
     to parsing the notes field for backward compatibility.
@@ -148,6 +272,12 @@ def _get_threshold_config(ds: dict[str, Any]) -> dict[str, Any]:
       threshold_z         : float (for z_score, e.g. 2.5)
       threshold_window_days: int (for rolling_pct + z_score)
     """
+    ix = snapshot.get("_ix") if snapshot is not None else None
+    if ix is not None:
+        cached = ix["THRESHOLDS"].get(ds.get("dataset_id"))
+        if cached is not None:
+            return cached
+
     # Primary: dedicated columns
     method = ds.get("threshold_method")
 
@@ -172,13 +302,16 @@ def _get_threshold_config(ds: dict[str, Any]) -> dict[str, Any]:
                 pass
         return default
 
-    return {
+    config = {
         "threshold_method":      str(method).strip(),
         "threshold_min_size":    _col_or_notes("threshold_min_size",  "min_size",    int,   50),
         "threshold_pct":         _col_or_notes("threshold_pct",       "pct",         float, 99.0),
         "threshold_z":           _col_or_notes("threshold_z",         "z_threshold", float, 2.5),
         "threshold_window_days": _col_or_notes("threshold_window_days","window_days", int,   63),
     }
+    if ix is not None:
+        ix["THRESHOLDS"][ds.get("dataset_id")] = config
+    return config
 
 
 # ---------------------------------------------------------------------------
@@ -211,15 +344,29 @@ def _canonical_root(data_root: Path, table_name: str, instrument_id: str) -> Pat
     return data_root / "canonical" / dir_name
 
 
+# session_dir -> (dir mtime_ns, sorted date names). Adding or removing a date
+# dir bumps the session dir's mtime, so a stale entry is never served.
+_DATES_CACHE: dict[str, tuple[int, tuple[str, ...]]] = {}
+
+
 def _list_available_dates(root: Path, session: str) -> list[str]:
     """Return sorted list of YYYY-MM-DD date dirs under root/session/."""
-    session_dir = root / session
-    if not session_dir.exists():
+    session_dir = str(root / session)
+    try:
+        mtime_ns = os.stat(session_dir).st_mtime_ns
+    except FileNotFoundError:
         return []
-    return sorted(
-        d for d in os.listdir(session_dir)
-        if len(d) == 10 and (session_dir / d).is_dir()
-    )
+    cached = _DATES_CACHE.get(session_dir)
+    if cached is not None and cached[0] == mtime_ns:
+        return list(cached[1])
+    # scandir's DirEntry.is_dir() uses the dirent type, so no stat per date.
+    with os.scandir(session_dir) as it:
+        dates = tuple(sorted(
+            e.name for e in it
+            if len(e.name) == 10 and e.is_dir()
+        ))
+    _DATES_CACHE[session_dir] = (mtime_ns, dates)
+    return list(dates)
 
 
 def _parquet_files_for_dates(
@@ -232,8 +379,16 @@ def _parquet_files_for_dates(
     session_dir = root / session
     for d in dates:
         date_dir = session_dir / d
-        if date_dir.exists():
-            files.extend(sorted(date_dir.glob("part-*.parquet")))
+        # One readdir per date; prefix/suffix checks instead of glob matching.
+        try:
+            with os.scandir(date_dir) as it:
+                names = sorted(
+                    e.name for e in it
+                    if e.name.startswith("part-") and e.name.endswith(".parquet")
+                )
+        except FileNotFoundError:
+            continue
+        files.extend(date_dir / n for n in names)
     return files
 
 
@@ -255,47 +410,379 @@ def _lookback_start(start_date: str, window_days: int) -> str:
 # DuckDB helpers
 # ---------------------------------------------------------------------------
 
-def _file_list_sql(files: list[Path]) -> str:
-    """Format a list of paths as a DuckDB array literal."""
-    return (
-        "["
-        + ", ".join(f"'{str(p).replace(chr(92), '/')}'" for p in files)
-        + "]"
-    )
+def _file_list(files: list[Path]) -> list[str]:
+    """Paths as forward-slash strings, bound as a DuckDB LIST parameter."""
+    return [p.as_posix() for p in files]
+
+
+def _utc_ts(date: str, time: dt.time = dt.time(0)) -> dt.datetime:
+    """
+    Timezone-aware UTC bound for ts_event. DuckDB binds it as TIMESTAMPTZ, the
+    column's own type, so the comparison needs no cast and is pushed into the
+    Parquet scan as a min/max row-group filter.
+    """
+    return dt.datetime.combine(dt.date.fromisoformat(date), time, tzinfo=dt.timezone.utc)
+
+
+# (files parameter name, files it will be bound to, connection) -> event SQL
+_EventsSql = Callable[[str, list[Path], duckdb.DuckDBPyConnection], str]
+
+
+def _spread_filter(files: list[Path], con: duckdb.DuckDBPyConnection) -> tuple[str, str]:
+    """
+    (extra read_parquet options, WHERE predicate) that drop spread trades.
+
+    Uses the boolean is_spread column written at ingest when every file has
+    it. Partitions written before that column existed fall back to the
+    symbol LIKE '%-%' test; a mix of both reads with union_by_name, where the
+    old files see is_spread as NULL.
+    """
+    (n_flagged,) = con.execute(
+        "SELECT count(DISTINCT file_name) FROM parquet_schema($files) "
+        "WHERE name = 'is_spread'",
+        {"files": _file_list(files)},
+    ).fetchone()
+    if n_flagged == len(files):
+        return "", "NOT is_spread"
+    if n_flagged == 0:
+        return "", "symbol NOT LIKE '%-%'"
+    return ", union_by_name = true", "NOT COALESCE(is_spread, symbol LIKE '%-%')"
+
+
+def _real_events_sql(
+    files_param: str,
+    files: list[Path],
+    con: duckdb.DuckDBPyConnection,
+) -> str:
+    """Every outright (non-spread) trade as an event row.
+
+    Side encoding in canonical: Int16  2→'B', 1→'S', 0→'N'
+    """
+    read_opts, not_spread = _spread_filter(files, con)
+    return f"""
+        SELECT
+            ts_event,
+            symbol,
+            CAST(price AS DOUBLE)  AS price,
+            CAST(size  AS BIGINT)  AS size,
+            CASE side WHEN 2 THEN 'B'
+                      WHEN 1 THEN 'S'
+                      ELSE 'N' END AS side
+        FROM read_parquet({files_param}{read_opts})
+        WHERE {not_spread}
+    """
+
+
+def _proxy_events_sql(
+    files_param: str,
+    files: list[Path],
+    con: duckdb.DuckDBPyConnection,
+) -> str:
+    """BVC buy/sell events derived from 1s OHLCV bars.
+
+    buy_frac = (close - low) / (high - low) for non-doji bars
+             = 0.5 for doji bars (high == low) → SKIPPED (ambiguous direction)
+
+    Buy event:  price=high, size=round(volume * buy_frac)   when buy_frac > 0.5
+    Sell event: price=low,  size=round(volume * sell_frac)  when buy_frac < 0.5
+    """
+    return f"""
+        WITH bvc AS (
+            SELECT
+                ts_event,
+                symbol,
+                CAST(high   AS DOUBLE)  AS high,
+                CAST(low    AS DOUBLE)  AS low,
+                CAST(volume AS BIGINT)  AS volume,
+                CASE WHEN high = low THEN 0.5
+                     ELSE CAST((close - low) AS DOUBLE) / CAST((high - low) AS DOUBLE)
+                END AS buy_frac
+            FROM read_parquet({files_param})
+            WHERE volume > 0
+        )
+        -- One row per bar: buy side at the high, sell side at the low
+        SELECT ts_event, symbol,
+               CASE WHEN buy_frac > 0.5 THEN high ELSE low END AS price,
+               CAST(ROUND(volume * CASE WHEN buy_frac > 0.5 THEN buy_frac
+                                        ELSE 1.0 - buy_frac END) AS BIGINT) AS size,
+               CASE WHEN buy_frac > 0.5 THEN 'B' ELSE 'S' END AS side
+        FROM bvc
+        WHERE buy_frac <> 0.5
+        -- Doji bars (buy_frac = 0.5) are SKIPPED — direction ambiguous
+    """
 
 
 # ---------------------------------------------------------------------------
-# Real trades computation
+# Threshold cache (rolling_pct / z_score)
 # ---------------------------------------------------------------------------
 
-def _compute_real(
+def _threshold_cache_path(
     data_root: Path,
-    source_dataset: dict[str, Any],
-    instrument_id: str,
+    canon_root: Path,
     session: str,
+    method: str,
+    param: float | None,
+    window_days: int,
     start_date: str,
-    end_date: str,
+    lookback_dates: list[str],
+) -> Path:
+    """
+    Location of the cached lookback statistics (from a lookback scan, never
+    from sidecars) for one threshold request.
+
+    The key includes the exact list of lookback dates on disk, so a backfilled
+    or newly ingested date inside the window produces a new key (the old file
+    is simply never read again).
+    """
+    key = {
+        "canon_root": str(canon_root),
+        "session": session,
+        "method": method,
+        "param": param,
+        "sample_rows": _PCT_SAMPLE_ROWS if method == "rolling_pct" else None,
+        "window_days": window_days,
+        "start_date": start_date,
+        "lookback": hashlib.sha256(",".join(lookback_dates).encode("utf-8")).hexdigest(),
+    }
+    digest = hashlib.sha256(json.dumps(key, sort_keys=True).encode("utf-8")).hexdigest()
+    return data_root / "cache" / "big_trades_thresholds" / f"{digest[:32]}.json"
+
+
+def _read_threshold_cache(path: Path) -> dict[str, Any] | None:
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+
+def _write_threshold_cache(path: Path, stats: dict[str, Any]) -> None:
+    """Best-effort atomic write (tmp + rename); a read-only DATA_ROOT just skips caching."""
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_text(json.dumps(stats), encoding="utf-8")
+        os.replace(tmp, path)
+    except OSError:
+        pass
+
+
+def _lookback_stats(
+    events_sql_for: _EventsSql,
+    lookback_files: list[Path],
     threshold_config: dict[str, Any],
+    start_date: str,
     con: duckdb.DuckDBPyConnection,
-) -> pd.DataFrame:
+) -> dict[str, Any]:
+    """Scan the lookback window once and return the statistics the cutoff needs."""
+    events_sql = events_sql_for("$lookback_files", lookback_files, con)
+    params = {
+        "lookback_files": _file_list(lookback_files),
+        "start_ts": _utc_ts(start_date),
+    }
+    if threshold_config["threshold_method"] == "rolling_pct":
+        pct = threshold_config["threshold_pct"]
+        # The percentile is taken over a fixed-size uniform reservoir sample,
+        # so the sort stays bounded however long the window is. Windows with
+        # fewer rows than the reservoir are used whole (exact percentile).
+        (q,) = con.execute(f"""
+            SELECT quantile_cont(size, {pct / 100.0})
+            FROM (
+                SELECT size
+                FROM ({events_sql})
+                WHERE ts_event < $start_ts
+            ) USING SAMPLE reservoir({_PCT_SAMPLE_ROWS} ROWS) REPEATABLE (42)
+        """, params).fetchone()
+        return {"cutoff": q}
+
+    mu, sigma = con.execute(f"""
+        SELECT AVG(CAST(size AS DOUBLE)), STDDEV(CAST(size AS DOUBLE))
+        FROM ({events_sql})
+        WHERE ts_event < $start_ts
+    """, params).fetchone()
+    return {"mu": mu, "sigma": sigma}
+
+
+def _cutoff_from_stats(stats: dict[str, Any], threshold_config: dict[str, Any]) -> float | None:
+    """Size cutoff for the event window; None when the lookback had no data."""
+    if threshold_config["threshold_method"] == "rolling_pct":
+        return stats.get("cutoff")
+    mu, sigma = stats.get("mu"), stats.get("sigma")
+    if mu is None or sigma is None:
+        return None
+    return mu + threshold_config["threshold_z"] * sigma
+
+
+# ---------------------------------------------------------------------------
+# Size-statistics sidecars (optional; tools/build/build_big_trades_stats.py)
+# ---------------------------------------------------------------------------
+
+def _size_stats_path(canon_root: Path, session: str, date: str) -> Path:
+    """{canon_root}/stats/{session}/{date}.parquet — histogram of event sizes."""
+    return canon_root / "stats" / session / f"{date}.parquet"
+
+
+def _parts_mtime_ns(date_dir: Path) -> int | None:
+    """Newest mtime of the part-*.parquet files in date_dir (None if there are none)."""
+    newest: int | None = None
+    try:
+        with os.scandir(date_dir) as it:
+            for e in it:
+                if e.name.startswith("part-") and e.name.endswith(".parquet"):
+                    m = e.stat().st_mtime_ns
+                    if newest is None or m > newest:
+                        newest = m
+    except FileNotFoundError:
+        return None
+    return newest
+
+
+def _size_stats_fresh(canon_root: Path, session: str, date: str) -> bool:
+    """True when the date's sidecar exists and is newer than all of its parts."""
+    parts_mtime = _parts_mtime_ns(canon_root / session / date)
+    if parts_mtime is None:
+        return True  # nothing to summarise
+    try:
+        return _size_stats_path(canon_root, session, date).stat().st_mtime_ns >= parts_mtime
+    except FileNotFoundError:
+        return False
+
+
+def _write_size_stats(
+    canon_root: Path,
+    session: str,
+    date: str,
+    events_sql_for: _EventsSql,
+    con: duckdb.DuckDBPyConnection,
+) -> int:
     """
-    Query canonical trades parquet and return big-trade events.
+    Write the sidecar for one date partition: one row per (utc_date, size)
+    with the number of events n. Returns the number of histogram rows
+    written (0 = the partition has no part files; nothing is written).
 
-    Side encoding in canonical: Int16  2→'B', 1→'S', 0→'N'
+    Event sizes are integer contract counts, so the histogram is small and
+    merges exactly across dates; utc_date lets readers apply the same
+    ts_event < start_date cut as the full scan.
     """
-    canon_root = _canonical_root(
-        data_root,
-        source_dataset.get("canonical_table_name", ""),
-        instrument_id,
+    import pyarrow.parquet as pq
+
+    files = _parquet_files_for_dates(canon_root, session, [date])
+    if not files:
+        return 0
+    table = con.execute(f"""
+        SELECT CAST(ts_event AS DATE) AS utc_date, size, count(*) AS n
+        FROM ({events_sql_for("$files", files, con)})
+        GROUP BY ALL
+        ORDER BY ALL
+    """, {"files": _file_list(files)}).fetch_arrow_table()
+
+    path = _size_stats_path(canon_root, session, date)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    pq.write_table(table, tmp)
+    os.replace(tmp, path)
+    return table.num_rows
+
+
+def _sidecar_lookback_stats(
+    canon_root: Path,
+    session: str,
+    lookback_dates: list[str],
+    threshold_config: dict[str, Any],
+    start_date: str,
+    con: duckdb.DuckDBPyConnection,
+) -> dict[str, Any] | None:
+    """
+    Lookback statistics merged from size sidecars, without reading the base
+    parquet. None when any lookback date lacks a fresh sidecar (the caller
+    then scans). Results are exact: rolling_pct interpolates like
+    quantile_cont over the full window (no sampling) and z_score uses the
+    sample standard deviation, as STDDEV does.
+    """
+    if not lookback_dates:
+        return None
+    if not all(_size_stats_fresh(canon_root, session, d) for d in lookback_dates):
+        return None
+    stats_files = [
+        p for p in (_size_stats_path(canon_root, session, d) for d in lookback_dates)
+        if p.exists()
+    ]
+    if not stats_files:
+        return None
+
+    hist = con.execute("""
+        SELECT size, CAST(sum(n) AS BIGINT)
+        FROM read_parquet($files)
+        WHERE utc_date < CAST($start_date AS DATE) AND size IS NOT NULL
+        GROUP BY size
+        ORDER BY size
+    """, {"files": _file_list(stats_files), "start_date": start_date}).fetchall()
+    total = sum(n for _size, n in hist)
+
+    if threshold_config["threshold_method"] == "rolling_pct":
+        if total == 0:
+            return {"cutoff": None}
+        pos = (total - 1) * (threshold_config["threshold_pct"] / 100.0)
+        lo_rank, hi_rank = math.floor(pos), math.ceil(pos)
+        lo = hi = None
+        seen = 0
+        for size, n in hist:
+            seen += n
+            if lo is None and seen > lo_rank:
+                lo = size
+            if seen > hi_rank:
+                hi = size
+                break
+        return {"cutoff": lo + (pos - lo_rank) * (hi - lo)}
+
+    # Python ints keep the sums exact.
+    s1 = sum(size * n for size, n in hist)
+    s2 = sum(size * size * n for size, n in hist)
+    mu = s1 / total if total else None
+    sigma = (
+        math.sqrt((total * s2 - s1 * s1) / (total * (total - 1)))
+        if total > 1 else None
     )
+    return {"mu": mu, "sigma": sigma}
+
+
+# ---------------------------------------------------------------------------
+# Event computation (shared by real trades and proxy)
+# ---------------------------------------------------------------------------
 
+def _compute_events(
+    data_root: Path,
+    canon_root: Path,
+    session: str,
+    start_date: str,
+    end_date: str,
+    threshold_config: dict[str, Any],
+    con: duckdb.DuckDBPyConnection,
+    events_sql_for: _EventsSql,
+    name: str,
+    order: bool = True,
+) -> tuple[str, dict[str, Any]] | None:
+    """
+    Build the SQL selecting events with size >= threshold from canonical
+    parquet under canon_root, plus its named parameters (all prefixed with
+    name, so two sources can share one statement). With order=True the rows
+    are sorted by ts_event; callers that sort a combined result pass False.
+    None means "no events" (no data in range, or no lookback data to derive
+    a cutoff from).
+
+    fixed_count reads only [start_date, end_date]. rolling_pct / z_score first
+    derive the cutoff from the lookback window (size sidecars when fresh,
+    otherwise a scan cached on disk under {data_root}/cache/big_trades_thresholds/),
+    then scan only the event window.
+    Bound parameters are folded into the Parquet scan filters like literals,
+    so row groups are still skipped on size statistics.
+    """
     threshold_method = threshold_config["threshold_method"]
     window_days = threshold_config["threshold_window_days"]
 
     # Determine date range to load (extended for rolling methods)
     available = _list_available_dates(canon_root, session)
     if not available:
-        return _empty_df()
+        return None
 
     if threshold_method == "fixed_count":
         load_dates = _dates_in_range(available, start_date, end_date)
@@ -304,103 +791,88 @@ def _compute_real(
         load_dates = _dates_in_range(available, lb_start, end_date)
 
     if not load_dates:
-        return _empty_df()
+        return None
 
     files = _parquet_files_for_dates(canon_root, session, load_dates)
     if not files:
-        return _empty_df()
+        return None
 
-    fl = _file_list_sql(files)
+    order_by = "ORDER BY ts_event" if order else ""
 
     if threshold_method == "fixed_count":
         min_size = threshold_config["threshold_min_size"]
         sql = f"""
-            SELECT
-                ts_event,
-                symbol,
-                CAST(price AS DOUBLE)  AS price,
-                CAST(size  AS BIGINT)  AS size,
-                CASE WHEN CAST(side AS INTEGER) = 2 THEN 'B'
-                     WHEN CAST(side AS INTEGER) = 1 THEN 'S'
-                     ELSE 'N' END      AS side
-            FROM read_parquet({fl})
-            WHERE CAST(size AS BIGINT) >= {min_size}
-              AND symbol NOT LIKE '%-%'
-            ORDER BY ts_event
-        """
-
-    elif threshold_method == "rolling_pct":
-        pct = threshold_config["threshold_pct"]
-        sql = f"""
-            WITH base AS (
-                SELECT
-                    ts_event,
-                    symbol,
-                    CAST(price AS DOUBLE)  AS price,
-                    CAST(size  AS BIGINT)  AS size,
-                    CASE WHEN CAST(side AS INTEGER) = 2 THEN 'B'
-                         WHEN CAST(side AS INTEGER) = 1 THEN 'S'
-                         ELSE 'N' END      AS side
-                FROM read_parquet({fl})
-                WHERE symbol NOT LIKE '%-%'
-            ),
-            threshold AS (
-                SELECT PERCENTILE_CONT({pct / 100.0}) WITHIN GROUP (ORDER BY size) AS cutoff
-                FROM base
-                WHERE ts_event < TIMESTAMPTZ '{start_date} 00:00:00+00'
-            )
-            SELECT b.ts_event, b.symbol, b.price, b.size, b.side
-            FROM base b, threshold t
-            WHERE b.ts_event >= TIMESTAMPTZ '{start_date} 00:00:00+00'
-              AND b.ts_event <= TIMESTAMPTZ '{end_date} 23:59:59+00'
-              AND b.size >= t.cutoff
-            ORDER BY b.ts_event
-        """
-
-    elif threshold_method == "z_score":
-        z_threshold = threshold_config["threshold_z"]
-        sql = f"""
-            WITH base AS (
-                SELECT
-                    ts_event,
-                    symbol,
-                    CAST(price AS DOUBLE)  AS price,
-                    CAST(size  AS BIGINT)  AS size,
-                    CASE WHEN CAST(side AS INTEGER) = 2 THEN 'B'
-                         WHEN CAST(side AS INTEGER) = 1 THEN 'S'
-                         ELSE 'N' END      AS side
-                FROM read_parquet({fl})
-                WHERE symbol NOT LIKE '%-%'
-            ),
-            stats AS (
-                SELECT
-                    AVG(CAST(size AS DOUBLE))    AS mu,
-                    STDDEV(CAST(size AS DOUBLE)) AS sigma
-                FROM base
-                WHERE ts_event < TIMESTAMPTZ '{start_date} 00:00:00+00'
-            )
-            SELECT b.ts_event, b.symbol, b.price, b.size, b.side
-            FROM base b, stats s
-            WHERE b.ts_event >= TIMESTAMPTZ '{start_date} 00:00:00+00'
-              AND b.ts_event <= TIMESTAMPTZ '{end_date} 23:59:59+00'
-              AND CAST(b.size AS DOUBLE) >= s.mu + {z_threshold} * s.sigma
-            ORDER BY b.ts_event
+            SELECT ts_event, symbol, {_OUT_COLS}, side
+            FROM ({events_sql_for(f"${name}_files", files, con)})
+            WHERE size >= ${name}_min_size
+            {order_by}
         """
+        return sql, {f"{name}_files": _file_list(files), f"{name}_min_size": min_size}
 
-    else:
+    if threshold_method not in ("rolling_pct", "z_score"):
         raise ValueError(
             f"Unknown threshold_method {threshold_method!r}. "
             "Expected: fixed_count, rolling_pct, z_score."
         )
 
-    return con.execute(sql).df()
+    # Partition dates never hold events from an earlier UTC day, so the lookback
+    # statistics (ts_event < start_date) only need the dates before start_date.
+    lookback_dates = [d for d in load_dates if d < start_date]
+    param = threshold_config["threshold_pct"] if threshold_method == "rolling_pct" else None
+    # Size sidecars, when fresh for the whole window, give exact statistics
+    # without the base scan. They are checked before the cache and never
+    # cached, so the cache only ever holds (possibly sampled) scan results.
+    stats = _sidecar_lookback_stats(
+        canon_root, session, lookback_dates, threshold_config, start_date, con,
+    )
+    if stats is None:
+        cache_path = _threshold_cache_path(
+            data_root, canon_root, session, threshold_method, param,
+            window_days, start_date, lookback_dates,
+        )
+        stats = _read_threshold_cache(cache_path)
+        if stats is None:
+            lookback_files = _parquet_files_for_dates(canon_root, session, lookback_dates)
+            if lookback_files:
+                stats = _lookback_stats(
+                    events_sql_for, lookback_files, threshold_config, start_date, con,
+                )
+            else:
+                stats = {"cutoff": None, "mu": None, "sigma": None}
+            _write_threshold_cache(cache_path, stats)
+
+    cutoff = _cutoff_from_stats(stats, threshold_config)
+    if cutoff is None:
+        return None
+
+    # Event sizes are integers, so size >= cutoff  <=>  size >= ceil(cutoff).
+    # The day before start_date is included because partitions keyed on a
+    # non-UTC calendar date (1s OHLCV uses New York dates) can spill into it.
+    event_dates = [d for d in load_dates if d >= _lookback_start(start_date, 1)]
+    event_files = _parquet_files_for_dates(canon_root, session, event_dates)
+    if not event_files:
+        return None
+    sql = f"""
+        SELECT ts_event, symbol, {_OUT_COLS}, side
+        FROM ({events_sql_for(f"${name}_files", event_files, con)})
+        WHERE ts_event >= ${name}_start_ts
+          AND ts_event <= ${name}_end_ts
+          AND size >= ${name}_min_size
+        {order_by}
+    """
+    return sql, {
+        f"{name}_files": _file_list(event_files),
+        f"{name}_start_ts": _utc_ts(start_date),
+        f"{name}_end_ts": _utc_ts(end_date, dt.time(23, 59, 59)),
+        f"{name}_min_size": math.ceil(cutoff),
+    }
 
 
 # ---------------------------------------------------------------------------
-# Proxy (BVC from 1s OHLCV) computation
+# Real trades computation
 # ---------------------------------------------------------------------------
 
-def _compute_proxy(
+def _compute_real(
     data_root: Path,
     source_dataset: dict[str, Any],
     instrument_id: str,
@@ -409,171 +881,53 @@ def _compute_proxy(
     end_date: str,
     threshold_config: dict[str, Any],
     con: duckdb.DuckDBPyConnection,
-) -> pd.DataFrame:
+    order: bool = True,
+) -> tuple[str, dict[str, Any]] | None:
     """
-    Derive big-trade events from 1s OHLCV using BVC.
+    SQL + parameters for big-trade events from canonical trades parquet
+    (None if no events).
 
-    buy_frac = (close - low) / (high - low) for non-doji bars
-             = 0.5 for doji bars (high == low) → SKIPPED (ambiguous direction)
-
-    Buy event:  price=high, size=round(volume * buy_frac)   when buy_frac > 0.5
-    Sell event: price=low,  size=round(volume * sell_frac)  when buy_frac < 0.5
+    Side encoding in canonical: Int16  2→'B', 1→'S', 0→'N'
     """
     canon_root = _canonical_root(
         data_root,
         source_dataset.get("canonical_table_name", ""),
         instrument_id,
     )
+    return _compute_events(
+        data_root, canon_root, session, start_date, end_date,
+        threshold_config, con, _real_events_sql, "real", order,
+    )
 
-    threshold_method = threshold_config["threshold_method"]
-    window_days = threshold_config["threshold_window_days"]
-
-    available = _list_available_dates(canon_root, session)
-    if not available:
-        return _empty_df()
-
-    if threshold_method == "fixed_count":
-        load_dates = _dates_in_range(available, start_date, end_date)
-    else:
-        lb_start = _lookback_start(start_date, window_days)
-        load_dates = _dates_in_range(available, lb_start, end_date)
-
-    if not load_dates:
-        return _empty_df()
-
-    files = _parquet_files_for_dates(canon_root, session, load_dates)
-    if not files:
-        return _empty_df()
-
-    fl = _file_list_sql(files)
-
-    if threshold_method == "fixed_count":
-        min_size = threshold_config["threshold_min_size"]
-        sql = f"""
-            WITH bvc AS (
-                SELECT
-                    ts_event,
-                    symbol,
-                    CAST(high   AS DOUBLE)  AS high,
-                    CAST(low    AS DOUBLE)  AS low,
-                    CAST(volume AS BIGINT)  AS volume,
-                    CASE WHEN high = low THEN 0.5
-                         ELSE CAST((close - low) AS DOUBLE) / CAST((high - low) AS DOUBLE)
-                    END AS buy_frac
-                FROM read_parquet({fl})
-                WHERE volume > 0
-            ),
-            events AS (
-                -- Buy events (proxy: price = high)
-                SELECT ts_event, symbol, high AS price,
-                       CAST(ROUND(volume * buy_frac)       AS BIGINT) AS size,
-                       'B' AS side
-                FROM bvc
-                WHERE buy_frac > 0.5
-                UNION ALL
-                -- Sell events (proxy: price = low)
-                SELECT ts_event, symbol, low  AS price,
-                       CAST(ROUND(volume * (1.0 - buy_frac)) AS BIGINT) AS size,
-                       'S' AS side
-                FROM bvc
-                WHERE buy_frac < 0.5
-                -- Doji bars (buy_frac = 0.5) are SKIPPED — direction ambiguous
-            )
-            SELECT ts_event, symbol, price, size, side
-            FROM events
-            WHERE size >= {min_size}
-            ORDER BY ts_event
-        """
-
-    elif threshold_method == "rolling_pct":
-        pct = threshold_config["threshold_pct"]
-        sql = f"""
-            WITH bvc AS (
-                SELECT
-                    ts_event,
-                    symbol,
-                    CAST(high   AS DOUBLE)  AS high,
-                    CAST(low    AS DOUBLE)  AS low,
-                    CAST(volume AS BIGINT)  AS volume,
-                    CASE WHEN high = low THEN 0.5
-                         ELSE CAST((close - low) AS DOUBLE) / CAST((high - low) AS DOUBLE)
-                    END AS buy_frac
-                FROM read_parquet({fl})
-                WHERE volume > 0
-            ),
-            events AS (
-                SELECT ts_event, symbol, high AS price,
-                       CAST(ROUND(volume * buy_frac)         AS BIGINT) AS size,
-                       'B' AS side
-                FROM bvc WHERE buy_frac > 0.5
-                UNION ALL
-                SELECT ts_event, symbol, low  AS price,
-                       CAST(ROUND(volume * (1.0 - buy_frac)) AS BIGINT) AS size,
-                       'S' AS side
-                FROM bvc WHERE buy_frac < 0.5
-            ),
-            threshold AS (
-                SELECT PERCENTILE_CONT({pct / 100.0}) WITHIN GROUP (ORDER BY size) AS cutoff
-                FROM events
-                WHERE ts_event < TIMESTAMPTZ '{start_date} 00:00:00+00'
-            )
-            SELECT e.ts_event, e.symbol, e.price, e.size, e.side
-            FROM events e, threshold t
-            WHERE e.ts_event >= TIMESTAMPTZ '{start_date} 00:00:00+00'
-              AND e.ts_event <= TIMESTAMPTZ '{end_date} 23:59:59+00'
-              AND e.size >= t.cutoff
-            ORDER BY e.ts_event
-        """
 
-    elif threshold_method == "z_score":
-        z_threshold = threshold_config["threshold_z"]
-        sql = f"""
-            WITH bvc AS (
-                SELECT
-                    ts_event,
-                    symbol,
-                    CAST(high   AS DOUBLE)  AS high,
-                    CAST(low    AS DOUBLE)  AS low,
-                    CAST(volume AS BIGINT)  AS volume,
-                    CASE WHEN high = low THEN 0.5
-                         ELSE CAST((close - low) AS DOUBLE) / CAST((high - low) AS DOUBLE)
-                    END AS buy_frac
-                FROM read_parquet({fl})
-                WHERE volume > 0
-            ),
-            events AS (
-                SELECT ts_event, symbol, high AS price,
-                       CAST(ROUND(volume * buy_frac)         AS BIGINT) AS size,
-                       'B' AS side
-                FROM bvc WHERE buy_frac > 0.5
-                UNION ALL
-                SELECT ts_event, symbol, low  AS price,
-                       CAST(ROUND(volume * (1.0 - buy_frac)) AS BIGINT) AS size,
-                       'S' AS side
-                FROM bvc WHERE buy_frac < 0.5
-            ),
-            stats AS (
-                SELECT
-                    AVG(CAST(size AS DOUBLE))    AS mu,
-                    STDDEV(CAST(size AS DOUBLE)) AS sigma
-                FROM events
-                WHERE ts_event < TIMESTAMPTZ '{start_date} 00:00:00+00'
-            )
-            SELECT e.ts_event, e.symbol, e.price, e.size, e.side
-            FROM events e, stats s
-            WHERE e.ts_event >= TIMESTAMPTZ '{start_date} 00:00:00+00'
-              AND e.ts_event <= TIMESTAMPTZ '{end_date} 23:59:59+00'
-              AND CAST(e.size AS DOUBLE) >= s.mu + {z_threshold} * s.sigma
-            ORDER BY e.ts_event
-        """
-
-    else:
-        raise ValueError(
-            f"Unknown threshold_method {threshold_method!r}. "
-            "Expected: fixed_count, rolling_pct, z_score."
-        )
+# ---------------------------------------------------------------------------
+# Proxy (BVC from 1s OHLCV) computation
+# ---------------------------------------------------------------------------
 
-    return con.execute(sql).df()
+def _compute_proxy(
+    data_root: Path,
+    source_dataset: dict[str, Any],
+    instrument_id: str,
+    session: str,
+    start_date: str,
+    end_date: str,
+    threshold_config: dict[str, Any],
+    con: duckdb.DuckDBPyConnection,
+    order: bool = True,
+) -> tuple[str, dict[str, Any]] | None:
+    """
+    SQL + parameters for big-trade events derived from 1s OHLCV using BVC
+    (see _proxy_events_sql); None if no events.
+    """
+    canon_root = _canonical_root(
+        data_root,
+        source_dataset.get("canonical_table_name", ""),
+        instrument_id,
+    )
+    return _compute_events(
+        data_root, canon_root, session, start_date, end_date,
+        threshold_config, con, _proxy_events_sql, "proxy", order,
+    )
 
 
 # ---------------------------------------------------------------------------
@@ -586,8 +940,8 @@ def _empty_df() -> pd.DataFrame:
     ).astype({
         "ts_event": "datetime64[us, UTC]",
         "symbol":   "object",
-        "price":    "float64",
-        "size":     "int64",
+        "price":    "float32",
+        "size":     "int32",
         "side":     "object",
     })
 
@@ -637,97 +991,95 @@ def get_big_trades(
     bt_dataset_id  = instrument.get("big_trades_dataset_id")
     btp_dataset_id = instrument.get("big_trades_proxy_dataset_id")
 
-    con = duckdb.connect()  # in-memory; no file needed
-
-    real_df  = pd.DataFrame()
-    proxy_df = pd.DataFrame()
-
-    def _get_real() -> pd.DataFrame:
+    def _get_real(order: bool = True) -> tuple[str, dict[str, Any]] | None:
         if not bt_dataset_id:
-            return _empty_df()
+            return None
         ds = _find_dataset_by_id(snapshot, bt_dataset_id)
         src_ds = _find_dataset_by_id(snapshot, ds["source_path_or_id"])
         return _compute_real(
             data_root, src_ds, instrument_id, session,
-            start_date, end_date, _get_threshold_config(ds), con,
+            start_date, end_date, _get_threshold_config(ds, snapshot), con, order,
         )
 
-    def _get_proxy() -> pd.DataFrame:
+    def _get_proxy(order: bool = True) -> tuple[str, dict[str, Any]] | None:
         if not btp_dataset_id:
-            return _empty_df()
+            return None
         ds = _find_dataset_by_id(snapshot, btp_dataset_id)
         src_ds = _find_dataset_by_id(snapshot, ds["source_path_or_id"])
         return _compute_proxy(
             data_root, src_ds, instrument_id, session,
-            start_date, end_date, _get_threshold_config(ds), con,
+            start_date, end_date, _get_threshold_config(ds, snapshot), con, order,
         )
 
-    if source_mode == "real_only":
-        result = _get_real()
-
-    elif source_mode == "proxy_only":
-        result = _get_proxy()
-
-    elif source_mode == "real_then_proxy":
-        # Real data where available (coverage check), proxy for the rest
-        real_df = _get_real()
-        if real_df.empty:
-            result = _get_proxy()
-        else:
-            real_dates = set(
-                pd.to_datetime(real_df["ts_event"]).dt.date.astype(str)
-            )
-            proxy_df = _get_proxy()
-            if not proxy_df.empty:
-                proxy_only = proxy_df[
-                    ~pd.to_datetime(proxy_df["ts_event"]).dt.date.astype(str).isin(real_dates)
-                ]
-                result = pd.concat([real_df, proxy_only], ignore_index=True).sort_values(
-                    "ts_event"
-                ).reset_index(drop=True)
+    # A cursor on the shared connection; closed on every exit, including
+    # errors from the _compute_* helpers or the query itself.
+    con = _get_con().cursor()
+    try:
+        # Each source yields one SQL query (+ its named parameters); the merge
+        # modes combine them into a single statement so DuckDB does the date
+        # anti-join, union and sort.
+        if source_mode == "real_only":
+            query = _get_real()
+
+        elif source_mode == "proxy_only":
+            query = _get_proxy()
+
+        elif source_mode in ("real_then_proxy", "proxy_then_real", "both"):
+            # The per-source queries are left unsorted; the combined result is
+            # sorted exactly once below.
+            real = _get_real(order=False)
+            proxy = _get_proxy(order=False)
+            if real is None or proxy is None:
+                sql, params = real or proxy or (None, None)
+            elif source_mode == "both":
+                (real_sql, real_params), (proxy_sql, proxy_params) = real, proxy
+                sql = f"""
+                    SELECT * FROM ({real_sql})
+                    UNION ALL
+                    SELECT * FROM ({proxy_sql})
+                """
+                params = {**real_params, **proxy_params}
             else:
-                result = real_df
-
-    elif source_mode == "proxy_then_real":
-        # Proxy as base; real overrides where it has coverage
-        proxy_df = _get_proxy()
-        real_df  = _get_real()
-        if proxy_df.empty:
-            result = real_df
-        elif real_df.empty:
-            result = proxy_df
+                # Real data where available (coverage check), proxy for the rest.
+                # Both modes keep the same rows: real events, plus proxy events on
+                # UTC dates with no real event.
+                (real_sql, real_params), (proxy_sql, proxy_params) = real, proxy
+                sql = f"""
+                    WITH real AS ({real_sql}),
+                         proxy AS ({proxy_sql})
+                    SELECT * FROM real
+                    UNION ALL
+                    SELECT * FROM proxy p
+                    WHERE NOT EXISTS (
+                        SELECT 1 FROM real r
+                        WHERE CAST(r.ts_event AS DATE) = CAST(p.ts_event AS DATE)
+                    )
+                """
+                params = {**real_params, **proxy_params}
+            query = (
+                (f"SELECT * FROM ({sql}) ORDER BY ts_event", params)
+                if sql is not None else None
+            )
+
         else:
-            real_dates = set(
-                pd.to_datetime(real_df["ts_event"]).dt.date.astype(str)
+            raise ValueError(
+                f"Unknown big_trades_source_mode {source_mode!r}. "
+                "Expected: real_only, proxy_only, real_then_proxy, proxy_then_real, both."
             )
-            proxy_only = proxy_df[
-                ~pd.to_datetime(proxy_df["ts_event"]).dt.date.astype(str).isin(real_dates)
-            ]
-            result = pd.concat([proxy_only, real_df], ignore_index=True).sort_values(
-                "ts_event"
-            ).reset_index(drop=True)
-
-    elif source_mode == "both":
-        real_df  = _get_real()
-        proxy_df = _get_proxy()
-        result = pd.concat([real_df, proxy_df], ignore_index=True).sort_values(
-            "ts_event"
-        ).reset_index(drop=True)
 
-    else:
-        raise ValueError(
-            f"Unknown big_trades_source_mode {source_mode!r}. "
-            "Expected: real_only, proxy_only, real_then_proxy, proxy_then_real, both."
-        )
+        if query is None:
+            return _empty_df()
 
-    con.close()
+        # Fetch as Arrow and convert to pandas once; price/size already arrive as
+        # float32/int32 from the output CASTs (_OUT_COLS).
+        table = con.execute(*query).fetch_arrow_table()
+    finally:
+        con.close()
 
-    if result.empty:
+    if table.num_rows == 0:
         return _empty_df()
 
-    # Ensure correct dtypes
-    result["price"] = result["price"].astype("float64")
-    result["size"]  = result["size"].astype("int64")
-    result["side"]  = result["side"].astype("object")
-
-    return result.reset_index(drop=True)
+    result = table.to_pandas(self_destruct=True)
+    # Keep side as object (pandas 3 would otherwise infer the str dtype).
+    result["side"] = result["side"].astype("object")
+    return result
@@ -0,0 +1,151 @@
+"""
+INSTRUCTION HEADER
+Purpose: Helpers shared by the tools/admin scripts that edit `config/run_config.xlsx`
+(add_*_config.py and migrate_run_config_add_*_cols.py).
+Inputs: An openpyxl workbook, or the xlsx path for read-only checks.
+Outputs: None directly; export_after_edit re-exports the config snapshot through
+tools/admin/export_config_snapshot.py.
+How to run: not a script. Each tool loads this file by path (tools/ is not a package)
+in its _load_config_tools().
+Success looks like: the calling tool's own messages.
+Common failures and fixes:
+- "Missing <sheet> sheet": run `pybt tools/admin/make_run_config_xlsx.py`.
+"""
+
+from __future__ import annotations
+
+import importlib.util
+import os
+from pathlib import Path
+from types import ModuleType
+from typing import TYPE_CHECKING, Any, NamedTuple
+
+if TYPE_CHECKING:
+    from openpyxl.worksheet.worksheet import Worksheet
+
+
+def _load_export() -> ModuleType:
+    """Load tools/admin/export_config_snapshot.py by file path."""
+    path = Path(__file__).resolve().parent / "export_config_snapshot.py"
+    spec = importlib.util.spec_from_file_location("export_config_snapshot", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+_export = _load_export()
+
+# Read-only checks read the workbook exactly as the export does (same backend
+# choice and cell rules).
+read_sheet_rows = _export.read_sheet_rows
+
+
+class SheetCtx(NamedTuple):
+    """A worksheet with its header row, read once and shared by the helpers below."""
+
+    ws: Worksheet
+    headers: list[Any]
+    col_of: dict[str, int]  # header name -> 1-based column
+
+
+def sheet_ctx(wb, sheet_name: str, id_header: str) -> SheetCtx:
+    """Read sheet_name's header row once; raise if the sheet or its id column is missing."""
+    if sheet_name not in wb.sheetnames:
+        raise ValueError(f"Missing {sheet_name} sheet in workbook.")
+
+    ws = wb[sheet_name]
+    headers = [c.value for c in ws[1]]
+    col_of = {name: i for i, name in enumerate(headers, start=1) if name is not None}
+
+    if id_header not in col_of:
+        raise ValueError(f"{sheet_name} sheet has no '{id_header}' header row.")
+    return SheetCtx(ws, headers, col_of)
+
+
+def read_existing_ids(xlsx_path: Path) -> set[object] | None:
+    """
+    dataset_ids already in DATASETS, read without building the openpyxl
+    workbook (see read_sheet_rows). None if the sheet or its dataset_id header
+    is missing; the writing path then raises its usual error.
+    """
+    rows = read_sheet_rows(xlsx_path, "DATASETS")
+    if not rows or "dataset_id" not in rows[0]:
+        return None
+    i = rows[0].index("dataset_id")
+    return {row[i] for row in rows[1:] if i < len(row)}
+
+
+def instrument_needs_update(xlsx_path: Path, instrument_id: str, updates: dict[str, object]) -> bool:
+    """
+    Read-only check of the INSTRUMENTS row (see read_sheet_rows): True if any
+    column in updates that the sheet has differs from its value. Columns the
+    sheet lacks are skipped, since the writing path cannot fill them either.
+    Also True if the sheet, header or row is missing, so the writing path
+    prints its usual message.
+    """
+    rows = read_sheet_rows(xlsx_path, "INSTRUMENTS")
+    if not rows or "instrument_id" not in rows[0]:
+        return True
+    headers = rows[0]
+    i = headers.index("instrument_id")
+    for row in rows[1:]:
+        if i < len(row) and row[i] == instrument_id:
+            current = dict(zip(headers, row))
+            return any(current.get(f) != v for f, v in updates.items() if f in current)
+    return True
+
+
+def add_row_if_missing(ctx: SheetCtx, row_data: dict[str, object], existing: set[object]) -> bool:
+    """
+    Append row_data to the DATASETS sheet if its dataset_id is not in existing
+    (the ids from read_existing_ids; added rows are recorded in it).
+    Returns True if added, False if already present.
+    """
+    dataset_id = row_data["dataset_id"]
+    if dataset_id in existing:
+        return False
+
+    ctx.ws.append([row_data.get(h) for h in ctx.headers])
+    existing.add(dataset_id)
+    return True
+
+
+def instrument_row_index(wb, id_col: int) -> dict[object, int]:
+    """
+    instrument_id -> INSTRUMENTS row number from one pass over the id column
+    (first row wins). Cached on wb, so updating several instruments in the
+    same workbook scans the sheet once; the tools never add or remove
+    INSTRUMENTS rows, so the index stays valid while wb is open.
+    """
+    index = getattr(wb, "_instrument_row_index", None)
+    if index is None:
+        index = {}
+        id_values = wb["INSTRUMENTS"].iter_rows(
+            min_row=2, min_col=id_col, max_col=id_col, values_only=True,
+        )
+        for row_idx, (iid,) in enumerate(id_values, start=2):
+            if iid is not None:
+                index.setdefault(iid, row_idx)
+        wb._instrument_row_index = index
+    return index
+
+
+def export_after_edit(wb, changed: bool) -> None:
+    """
+    Re-export the snapshot after a config tool has run.
+
+    Exports when the tool changed the workbook, or on every run with
+    FORCE_EXPORT=1. BACKTEST_DEFER_EXPORT=1 skips it, so a chain of config
+    tools can export once at the end. Both flags act only when set to exactly
+    "1"; unset, empty or any other value leaves them off. wb: the workbook
+    the tool loaded, if any; when changed, its rows are exported directly
+    instead of reading the saved xlsx back.
+    """
+    if os.environ.get("BACKTEST_DEFER_EXPORT") == "1":
+        print("BACKTEST_DEFER_EXPORT=1: run tools/admin/export_config_snapshot.py when done.")
+    elif changed or os.environ.get("FORCE_EXPORT") == "1":
+        # Only a workbook this run saved matches the file on disk.
+        _export.main(_export.rows_from_workbook(wb) if changed and wb is not None else None)
+        print("Config snapshot re-exported.")
+    else:
+        print("No changes; config snapshot not re-exported (set FORCE_EXPORT=1 to force).")
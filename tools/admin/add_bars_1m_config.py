@@ -21,10 +21,23 @@ How to run:
   # Add with explicit source dataset id:
   C:\\Users\\pcash\\anaconda3\\envs\\backtest\\python.exe tools\\admin\\add_bars_1m_config.py --instrument-id NQ --source-dataset-id DB_NQ_OHLCV_1S
 
+  # Re-export the snapshot even when nothing changed (both flags below
+  # act only when set to exactly 1):
+  set FORCE_EXPORT=1
+
+  # Chaining several config tools: skip each tool's export, then export once:
+  set BACKTEST_DEFER_EXPORT=1
+  (run the tools)
+  set BACKTEST_DEFER_EXPORT=
+  C:\\Users\\pcash\\anaconda3\\envs\\backtest\\python.exe tools\\admin\\export_config_snapshot.py
+
 What success looks like:
 - Prints "Added {ID}_BARS_1M to DATASETS" (or "already exists, skipping").
 - Prints "Updated INSTRUMENTS {ID} row".
-- Prints "Config snapshot re-exported".
+- On a re-run with nothing to change, prints "... workbook unchanged." instead and
+  does not rewrite the xlsx.
+- Prints "Config snapshot re-exported." (or "No changes; ..." when the workbook
+  was not rewritten).
 
 Common failures + fixes:
 - Permission error on xlsx: close Excel if the workbook is open, then retry.
@@ -36,13 +49,25 @@ Common failures + fixes:
 from __future__ import annotations
 
 import argparse
-import subprocess
-import sys
+import importlib.util
 from pathlib import Path
+from types import ModuleType
 
 from openpyxl import load_workbook
 
 
+def _load_config_tools() -> ModuleType:
+    """Load tools/admin/_config_tools.py (helpers shared by the config tools) by file path."""
+    path = Path(__file__).resolve().parent / "_config_tools.py"
+    spec = importlib.util.spec_from_file_location("_config_tools", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+config_tools = _load_config_tools()
+
+
 XLSX_PATH = Path("config/run_config.xlsx")
 
 
@@ -77,57 +102,22 @@ def _build_instrument_updates(instrument_id: str) -> dict[str, object]:
     }
 
 
-def _add_datasets_row(wb, instrument_id: str, source_dataset_id: str) -> bool:
-    """
-    Add a BARS_1M row to the DATASETS sheet for the given instrument.
-    Returns True if added, False if the row already exists (skipped).
-    """
-    if "DATASETS" not in wb.sheetnames:
-        raise ValueError("Missing DATASETS sheet in workbook.")
-
-    ws = wb["DATASETS"]
-    headers = [c.value for c in ws[1]]
-
-    if "dataset_id" not in headers:
-        raise ValueError("DATASETS sheet has no 'dataset_id' header row.")
-
-    dataset_id = f"{instrument_id}_BARS_1M"
-    id_col = headers.index("dataset_id") + 1
-    existing = {ws.cell(row=r, column=id_col).value for r in range(2, ws.max_row + 2)}
-
-    if dataset_id in existing:
-        return False
-
-    row_data = _build_datasets_row(instrument_id, source_dataset_id)
-    ws.append([row_data.get(h) for h in headers])
-    return True
-
-
-def _update_instruments_row(wb, instrument_id: str) -> bool:
+def _update_instruments_row(ctx: config_tools.SheetCtx, instrument_id: str) -> bool:
     """
     Update the INSTRUMENTS row matching instrument_id with OHLCV column references.
     Returns True if updated, False if the row was not found.
     """
-    if "INSTRUMENTS" not in wb.sheetnames:
-        raise ValueError("Missing INSTRUMENTS sheet in workbook.")
-
-    ws = wb["INSTRUMENTS"]
-    headers = [c.value for c in ws[1]]
-
-    if "instrument_id" not in headers:
-        raise ValueError("INSTRUMENTS sheet has no 'instrument_id' header.")
-
-    id_col = headers.index("instrument_id") + 1
+    ws, col_of = ctx.ws, ctx.col_of
     updates = _build_instrument_updates(instrument_id)
 
-    for row_idx in range(2, ws.max_row + 2):
-        if ws.cell(row=row_idx, column=id_col).value == instrument_id:
-            for field, value in updates.items():
-                if field in headers:
-                    ws.cell(row=row_idx, column=headers.index(field) + 1, value=value)
-            return True
+    row_idx = config_tools.instrument_row_index(ws.parent, col_of["instrument_id"]).get(instrument_id)
+    if row_idx is None:
+        return False
 
-    return False
+    for field, value in updates.items():
+        if field in col_of:
+            ws.cell(row=row_idx, column=col_of[field], value=value)
+    return True
 
 
 def main() -> int:
@@ -163,32 +153,50 @@ def main() -> int:
             f"Workbook not found: {XLSX_PATH}. Run tools/admin/make_run_config_xlsx.py first."
         )
 
-    wb = load_workbook(XLSX_PATH)
-
-    dataset_id = f"{instrument_id}_BARS_1M"
-    added = _add_datasets_row(wb, instrument_id, source_dataset_id)
-    print(
-        f"Added {dataset_id} to DATASETS (source: {source_dataset_id})."
-        if added
-        else f"{dataset_id} already in DATASETS, skipping."
-    )
-
-    updated = _update_instruments_row(wb, instrument_id)
-    print(
-        f"Updated INSTRUMENTS {instrument_id} row."
-        if updated
-        else f"WARNING: {instrument_id} row not found in INSTRUMENTS — skipping instrument update."
-    )
-
-    wb.save(XLSX_PATH)
-    wb.close()
-    print(f"Workbook saved: {XLSX_PATH}")
-
-    subprocess.run(
-        [sys.executable, "tools/admin/export_config_snapshot.py"],
-        check=True,
-    )
-    print("Config snapshot re-exported.")
+    # Decide from read-only scans; only a real change pays for the full
+    # (styles + cells) load and the save.
+    existing = config_tools.read_existing_ids(XLSX_PATH)
+    changed = False
+    wb = None
+    if (
+        existing is not None
+        and f"{instrument_id}_BARS_1M" in existing
+        and not config_tools.instrument_needs_update(
+            XLSX_PATH, instrument_id, _build_instrument_updates(instrument_id)
+        )
+    ):
+        print(f"{instrument_id}_BARS_1M config already present; workbook unchanged.")
+    else:
+        wb = load_workbook(XLSX_PATH)
+        try:
+            datasets = config_tools.sheet_ctx(wb, "DATASETS", "dataset_id")
+            instruments = config_tools.sheet_ctx(wb, "INSTRUMENTS", "instrument_id")
+            existing = existing or set()
+
+            dataset_id = f"{instrument_id}_BARS_1M"
+            added = config_tools.add_row_if_missing(
+                datasets, _build_datasets_row(instrument_id, source_dataset_id), existing
+            )
+            print(
+                f"Added {dataset_id} to DATASETS (source: {source_dataset_id})."
+                if added
+                else f"{dataset_id} already in DATASETS, skipping."
+            )
+
+            updated = _update_instruments_row(instruments, instrument_id)
+            print(
+                f"Updated INSTRUMENTS {instrument_id} row."
+                if updated
+                else f"WARNING: {instrument_id} row not found in INSTRUMENTS — skipping instrument update."
+            )
+
+            wb.save(XLSX_PATH)
+        finally:
+            wb.close()
+        print(f"Workbook saved: {XLSX_PATH}")
+        changed = True
+
+    config_tools.export_after_edit(wb, changed)
     return 0
 
 
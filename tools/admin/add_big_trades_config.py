@@ -33,11 +33,24 @@ How to run:
   # Add ES with custom thresholds:
   C:\\Users\\pcash\\anaconda3\\envs\\backtest\\python.exe tools\\admin\\add_big_trades_config.py --instrument-id ES --min-size 100 --proxy-min-size 200
 
+  # Re-export the snapshot even when nothing changed (both flags below
+  # act only when set to exactly 1):
+  set FORCE_EXPORT=1
+
+  # Chaining several config tools: skip each tool's export, then export once:
+  set BACKTEST_DEFER_EXPORT=1
+  (run the tools)
+  set BACKTEST_DEFER_EXPORT=
+  C:\\Users\\pcash\\anaconda3\\envs\\backtest\\python.exe tools\\admin\\export_config_snapshot.py
+
 What success looks like:
 - Prints "Added {ID}_BIG_TRADES to DATASETS" (or "already exists, skipping").
 - Prints "Added {ID}_BIG_TRADES_PROXY to DATASETS" (or "already exists, skipping").
 - Prints "Updated INSTRUMENTS {ID} row."
-- Prints "Config snapshot re-exported."
+- On a re-run with nothing to change, prints "... workbook unchanged." instead and
+  does not rewrite the xlsx.
+- Prints "Config snapshot re-exported." (or "No changes; ..." when the workbook
+  was not rewritten).
 
 Common failures + fixes:
 - Permission error on xlsx: close Excel if the workbook is open, then retry.
@@ -51,13 +64,25 @@ Common failures + fixes:
 from __future__ import annotations
 
 import argparse
-import subprocess
-import sys
+import importlib.util
 from pathlib import Path
+from types import ModuleType
 
 from openpyxl import load_workbook
 
 
+def _load_config_tools() -> ModuleType:
+    """Load tools/admin/_config_tools.py (helpers shared by the config tools) by file path."""
+    path = Path(__file__).resolve().parent / "_config_tools.py"
+    spec = importlib.util.spec_from_file_location("_config_tools", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+config_tools = _load_config_tools()
+
+
 XLSX_PATH = Path("config/run_config.xlsx")
 
 
@@ -115,65 +140,36 @@ def _big_trades_proxy_row(
     }
 
 
-def _add_row_if_missing(wb, row_data: dict[str, object]) -> bool:
-    """
-    Append row_data to the DATASETS sheet if dataset_id is not already present.
-    Returns True if added, False if already present.
-    """
-    if "DATASETS" not in wb.sheetnames:
-        raise ValueError("Missing DATASETS sheet in workbook.")
-
-    ws = wb["DATASETS"]
-    headers = [c.value for c in ws[1]]
-
-    if "dataset_id" not in headers:
-        raise ValueError("DATASETS sheet has no 'dataset_id' header row.")
-
-    id_col = headers.index("dataset_id") + 1
-    existing = {ws.cell(row=r, column=id_col).value for r in range(2, ws.max_row + 2)}
-
-    dataset_id = row_data["dataset_id"]
-    if dataset_id in existing:
-        return False
-
-    ws.append([row_data.get(h) for h in headers])
-    return True
+def _instrument_updates(instrument_id: str) -> dict[str, object]:
+    """INSTRUMENTS column values pointing at the big-trade datasets."""
+    return {
+        "big_trades_dataset_id":       f"{instrument_id}_BIG_TRADES",
+        "big_trades_proxy_dataset_id": f"{instrument_id}_BIG_TRADES_PROXY",
+        "big_trades_source_mode":      "real_then_proxy",
+    }
 
 
-def _update_instruments_row(wb, instrument_id: str) -> bool:
+def _update_instruments_row(ctx: config_tools.SheetCtx, instrument_id: str) -> bool:
     """
     Update the INSTRUMENTS row matching instrument_id with big-trade dataset references.
     Returns True if updated, False if row not found.
     """
-    if "INSTRUMENTS" not in wb.sheetnames:
-        raise ValueError("Missing INSTRUMENTS sheet in workbook.")
-
-    ws = wb["INSTRUMENTS"]
-    headers = [c.value for c in ws[1]]
-
-    if "instrument_id" not in headers:
-        raise ValueError("INSTRUMENTS sheet has no 'instrument_id' header.")
-
-    updates = {
-        "big_trades_dataset_id":       f"{instrument_id}_BIG_TRADES",
-        "big_trades_proxy_dataset_id": f"{instrument_id}_BIG_TRADES_PROXY",
-        "big_trades_source_mode":      "real_then_proxy",
-    }
+    ws, col_of = ctx.ws, ctx.col_of
+    updates = _instrument_updates(instrument_id)
 
-    id_col = headers.index("instrument_id") + 1
-    for row_idx in range(2, ws.max_row + 2):
-        if ws.cell(row=row_idx, column=id_col).value == instrument_id:
-            for field, value in updates.items():
-                if field in headers:
-                    ws.cell(row=row_idx, column=headers.index(field) + 1, value=value)
-                else:
-                    print(
-                        f"  WARNING: column '{field}' not found in INSTRUMENTS — "
-                        "run migrate_run_config_add_big_trades_cols.py first."
-                    )
-            return True
+    row_idx = config_tools.instrument_row_index(ws.parent, col_of["instrument_id"]).get(instrument_id)
+    if row_idx is None:
+        return False
 
-    return False
+    for field, value in updates.items():
+        if field in col_of:
+            ws.cell(row=row_idx, column=col_of[field], value=value)
+        else:
+            print(
+                f"  WARNING: column '{field}' not found in INSTRUMENTS — "
+                "run migrate_run_config_add_big_trades_cols.py first."
+            )
+    return True
 
 
 def main() -> int:
@@ -234,38 +230,56 @@ def main() -> int:
             f"Workbook not found: {XLSX_PATH}. Run tools/admin/make_run_config_xlsx.py first."
         )
 
-    wb = load_workbook(XLSX_PATH)
-
-    # Add DATASETS rows
-    for row_data in [
+    dataset_rows = [
         _big_trades_row(instrument_id, source_dataset_id, args.min_size),
         _big_trades_proxy_row(instrument_id, proxy_source_dataset_id, args.proxy_min_size),
-    ]:
-        did = row_data["dataset_id"]
-        added = _add_row_if_missing(wb, row_data)
-        print(
-            f"Added {did} to DATASETS."
-            if added
-            else f"{did} already in DATASETS, skipping."
+    ]
+
+    # Decide from read-only scans; only a real change pays for the full
+    # (styles + cells) load and the save.
+    existing = config_tools.read_existing_ids(XLSX_PATH)
+    changed = False
+    wb = None
+    if (
+        existing is not None
+        and all(r["dataset_id"] in existing for r in dataset_rows)
+        and not config_tools.instrument_needs_update(
+            XLSX_PATH, instrument_id, _instrument_updates(instrument_id)
         )
-
-    # Update INSTRUMENTS row
-    updated = _update_instruments_row(wb, instrument_id)
-    print(
-        f"Updated INSTRUMENTS {instrument_id} row."
-        if updated
-        else f"WARNING: {instrument_id} row not found in INSTRUMENTS — skipping instrument update."
-    )
-
-    wb.save(XLSX_PATH)
-    wb.close()
-    print(f"Workbook saved: {XLSX_PATH}")
-
-    subprocess.run(
-        [sys.executable, "tools/admin/export_config_snapshot.py"],
-        check=True,
-    )
-    print("Config snapshot re-exported.")
+    ):
+        print(f"{instrument_id} big-trades config already present; workbook unchanged.")
+    else:
+        wb = load_workbook(XLSX_PATH)
+        try:
+            datasets = config_tools.sheet_ctx(wb, "DATASETS", "dataset_id")
+            instruments = config_tools.sheet_ctx(wb, "INSTRUMENTS", "instrument_id")
+            existing = existing or set()
+
+            # Add DATASETS rows
+            for row_data in dataset_rows:
+                did = row_data["dataset_id"]
+                added = config_tools.add_row_if_missing(datasets, row_data, existing)
+                print(
+                    f"Added {did} to DATASETS."
+                    if added
+                    else f"{did} already in DATASETS, skipping."
+                )
+
+            # Update INSTRUMENTS row
+            updated = _update_instruments_row(instruments, instrument_id)
+            print(
+                f"Updated INSTRUMENTS {instrument_id} row."
+                if updated
+                else f"WARNING: {instrument_id} row not found in INSTRUMENTS — skipping instrument update."
+            )
+
+            wb.save(XLSX_PATH)
+        finally:
+            wb.close()
+        print(f"Workbook saved: {XLSX_PATH}")
+        changed = True
+
+    config_tools.export_after_edit(wb, changed)
     return 0
 
 
@@ -23,26 +23,53 @@ How to run:
   # Add with explicit source dataset id:
   C:\\Users\\pcash\\anaconda3\\envs\\backtest\\python.exe tools\\admin\\add_trade_metrics_config.py --instrument-id ES --source-dataset-id DB_ES_TRADES
 
+  # Re-export the snapshot even when nothing changed (both flags below
+  # act only when set to exactly 1):
+  set FORCE_EXPORT=1
+
+  # Chaining several config tools: skip each tool's export, then export once:
+  set BACKTEST_DEFER_EXPORT=1
+  (run the tools)
+  set BACKTEST_DEFER_EXPORT=
+  C:\\Users\\pcash\\anaconda3\\envs\\backtest\\python.exe tools\\admin\\export_config_snapshot.py
+
 What success looks like:
 - Prints "Added {ID}_FOOTPRINT_1M to DATASETS" (or "already exists, skipping").
 - Prints "Added {ID}_CVD_1M to DATASETS" (or "already exists, skipping").
-- Prints "Config snapshot re-exported".
+- On a re-run with nothing to change, prints "... workbook unchanged." and does
+  not rewrite the xlsx.
+- Prints "Config snapshot re-exported." (or "No changes; ..." when the workbook
+  was not rewritten).
 
 Common failures + fixes:
 - Permission error on xlsx: close Excel if the workbook is open, then retry.
 - "Missing sheet": run tools/admin/make_run_config_xlsx.py first.
+- Slow existence check on a big workbook: pip install python-calamine in the
+  backtest conda env (used automatically when installed; openpyxl is the fallback).
 """
 
 from __future__ import annotations
 
 import argparse
-import subprocess
-import sys
+import importlib.util
 from pathlib import Path
+from types import ModuleType
 
 from openpyxl import load_workbook
 
 
+def _load_config_tools() -> ModuleType:
+    """Load tools/admin/_config_tools.py (helpers shared by the config tools) by file path."""
+    path = Path(__file__).resolve().parent / "_config_tools.py"
+    spec = importlib.util.spec_from_file_location("_config_tools", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+config_tools = _load_config_tools()
+
+
 XLSX_PATH = Path("config/run_config.xlsx")
 
 
@@ -82,31 +109,6 @@ def _cvd_row(instrument_id: str, source_dataset_id: str) -> dict[str, object]:
     }
 
 
-def _add_row_if_missing(wb, row_data: dict[str, object]) -> bool:
-    """
-    Append row_data to the DATASETS sheet if dataset_id is not already present.
-    Returns True if added, False if already present.
-    """
-    if "DATASETS" not in wb.sheetnames:
-        raise ValueError("Missing DATASETS sheet in workbook.")
-
-    ws = wb["DATASETS"]
-    headers = [c.value for c in ws[1]]
-
-    if "dataset_id" not in headers:
-        raise ValueError("DATASETS sheet has no 'dataset_id' header row.")
-
-    id_col = headers.index("dataset_id") + 1
-    existing = {ws.cell(row=r, column=id_col).value for r in range(2, ws.max_row + 2)}
-
-    dataset_id = row_data["dataset_id"]
-    if dataset_id in existing:
-        return False
-
-    ws.append([row_data.get(h) for h in headers])
-    return True
-
-
 def main() -> int:
     parser = argparse.ArgumentParser(
         description=(
@@ -142,29 +144,42 @@ def main() -> int:
             f"Workbook not found: {XLSX_PATH}. Run tools/admin/make_run_config_xlsx.py first."
         )
 
-    wb = load_workbook(XLSX_PATH)
-
-    for row_data in [
+    dataset_rows = [
         _footprint_row(instrument_id, source_dataset_id),
         _cvd_row(instrument_id, source_dataset_id),
-    ]:
-        did = row_data["dataset_id"]
-        added = _add_row_if_missing(wb, row_data)
-        print(
-            f"Added {did} to DATASETS (source: {source_dataset_id})."
-            if added
-            else f"{did} already in DATASETS, skipping."
-        )
-
-    wb.save(XLSX_PATH)
-    wb.close()
-    print(f"Workbook saved: {XLSX_PATH}")
-
-    subprocess.run(
-        [sys.executable, "tools/admin/export_config_snapshot.py"],
-        check=True,
-    )
-    print("Config snapshot re-exported.")
+    ]
+
+    # Decide from a read-only scan; only a real change pays for the full
+    # (styles + cells) load and the save.
+    existing = config_tools.read_existing_ids(XLSX_PATH)
+    changed = False
+    wb = None
+    if existing is not None and all(r["dataset_id"] in existing for r in dataset_rows):
+        for row_data in dataset_rows:
+            print(f"{row_data['dataset_id']} already in DATASETS, skipping.")
+        print("Workbook unchanged.")
+    else:
+        wb = load_workbook(XLSX_PATH)
+        try:
+            datasets = config_tools.sheet_ctx(wb, "DATASETS", "dataset_id")
+            existing = existing or set()
+
+            for row_data in dataset_rows:
+                did = row_data["dataset_id"]
+                added = config_tools.add_row_if_missing(datasets, row_data, existing)
+                print(
+                    f"Added {did} to DATASETS (source: {source_dataset_id})."
+                    if added
+                    else f"{did} already in DATASETS, skipping."
+                )
+
+            wb.save(XLSX_PATH)
+        finally:
+            wb.close()
+        print(f"Workbook saved: {XLSX_PATH}")
+        changed = True
+
+    config_tools.export_after_edit(wb, changed)
     return 0
 
 
@@ -33,15 +33,30 @@ How to run:
   # Add with explicit source dataset id:
   C:\\Users\\pcash\\anaconda3\\envs\\backtest\\python.exe tools\\admin\\add_trade_metrics_proxy_config.py --instrument-id ES --source-dataset-id DB_ES_OHLCV_1S
 
+  # Re-export the snapshot even when nothing changed (both flags below
+  # act only when set to exactly 1):
+  set FORCE_EXPORT=1
+
+  # Chaining several config tools: skip each tool's export, then export once:
+  set BACKTEST_DEFER_EXPORT=1
+  (run the tools)
+  set BACKTEST_DEFER_EXPORT=
+  C:\\Users\\pcash\\anaconda3\\envs\\backtest\\python.exe tools\\admin\\export_config_snapshot.py
+
 What success looks like:
 - Prints "Added {ID}_FOOTPRINT_PROXY_1M to DATASETS" (or "already exists, skipping").
 - Prints "Added {ID}_CVD_PROXY_1M to DATASETS" (or "already exists, skipping").
 - Prints "Updated INSTRUMENTS {ID} row: footprint_proxy_dataset_id, cvd_proxy_dataset_id."
-- Prints "Config snapshot re-exported."
+- On a re-run with nothing to change, prints "... workbook unchanged." and does
+  not rewrite the xlsx.
+- Prints "Config snapshot re-exported." (or "No changes; ..." when the workbook
+  was not rewritten).
 
 Common failures + fixes:
 - Permission error on xlsx: close Excel if the workbook is open, then retry.
 - "Missing sheet": run tools/admin/make_run_config_xlsx.py first.
+- Slow existence check on a big workbook: pip install python-calamine in the
+  backtest conda env (used automatically when installed; openpyxl is the fallback).
 - "INSTRUMENTS row not found": check the instrument_id matches exactly what is in
   the INSTRUMENTS sheet (case-sensitive, e.g. "ES" not "es").
 """
@@ -49,13 +64,25 @@ Common failures + fixes:
 from __future__ import annotations
 
 import argparse
-import subprocess
-import sys
+import importlib.util
 from pathlib import Path
+from types import ModuleType
 
 from openpyxl import load_workbook
 
 
+def _load_config_tools() -> ModuleType:
+    """Load tools/admin/_config_tools.py (helpers shared by the config tools) by file path."""
+    path = Path(__file__).resolve().parent / "_config_tools.py"
+    spec = importlib.util.spec_from_file_location("_config_tools", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+config_tools = _load_config_tools()
+
+
 XLSX_PATH = Path("config/run_config.xlsx")
 
 
@@ -109,69 +136,52 @@ def _cvd_proxy_row(
     }
 
 
-def _add_row_if_missing(wb, row_data: dict[str, object]) -> bool:
+def _instrument_needs_update(xlsx_path: Path, instrument_id: str) -> bool:
     """
-    Append row_data to the DATASETS sheet if dataset_id is not already present.
-    Returns True if added, False if already present.
+    Read-only check of the INSTRUMENTS row: True if either proxy column the
+    sheet has is still blank. Also True if the sheet, header or row is
+    missing, so the writing path prints its usual message.
     """
-    if "DATASETS" not in wb.sheetnames:
-        raise ValueError("Missing DATASETS sheet in workbook.")
-
-    ws = wb["DATASETS"]
-    headers = [c.value for c in ws[1]]
-
-    if "dataset_id" not in headers:
-        raise ValueError("DATASETS sheet has no 'dataset_id' header row.")
-
-    id_col = headers.index("dataset_id") + 1
-    existing = {ws.cell(row=r, column=id_col).value for r in range(2, ws.max_row + 2)}
-
-    dataset_id = row_data["dataset_id"]
-    if dataset_id in existing:
-        return False
-
-    ws.append([row_data.get(h) for h in headers])
+    rows = config_tools.read_sheet_rows(xlsx_path, "INSTRUMENTS")
+    if not rows or "instrument_id" not in rows[0]:
+        return True
+    headers = rows[0]
+    i = headers.index("instrument_id")
+    for row in rows[1:]:
+        if i < len(row) and row[i] == instrument_id:
+            current = dict(zip(headers, row))
+            return any(
+                f in current and (current[f] is None or str(current[f]).strip() == "")
+                for f in ("footprint_proxy_dataset_id", "cvd_proxy_dataset_id")
+            )
     return True
 
 
-def _update_instruments_row(wb, instrument_id: str, fp_proxy_id: str, cvd_proxy_id: str) -> bool:
+def _update_instruments_row(ctx: config_tools.SheetCtx, instrument_id: str, fp_proxy_id: str, cvd_proxy_id: str) -> bool:
     """
     Update the INSTRUMENTS row for instrument_id with proxy dataset references.
     Only sets columns that are currently blank.
     Returns True if the row was found, False otherwise.
     """
-    if "INSTRUMENTS" not in wb.sheetnames:
-        raise ValueError("Missing INSTRUMENTS sheet in workbook.")
-
-    ws = wb["INSTRUMENTS"]
-    headers = [c.value for c in ws[1]]
-
-    if "instrument_id" not in headers:
-        raise ValueError("INSTRUMENTS sheet has no 'instrument_id' header.")
+    ws, col_of = ctx.ws, ctx.col_of
+    fpp_col  = col_of.get("footprint_proxy_dataset_id")
+    cvdp_col = col_of.get("cvd_proxy_dataset_id")
 
-    id_col = headers.index("instrument_id") + 1
-
-    def _col(name: str) -> int | None:
-        return (headers.index(name) + 1) if name in headers else None
-
-    fpp_col  = _col("footprint_proxy_dataset_id")
-    cvdp_col = _col("cvd_proxy_dataset_id")
-
-    for row_idx in range(2, ws.max_row + 2):
-        if ws.cell(row=row_idx, column=id_col).value == instrument_id:
-            def _blank(col_idx: int | None) -> bool:
-                if col_idx is None:
-                    return False
-                v = ws.cell(row=row_idx, column=col_idx).value
-                return v is None or str(v).strip() == ""
+    row_idx = config_tools.instrument_row_index(ws.parent, col_of["instrument_id"]).get(instrument_id)
+    if row_idx is None:
+        return False
 
-            if fpp_col and _blank(fpp_col):
-                ws.cell(row=row_idx, column=fpp_col, value=fp_proxy_id)
-            if cvdp_col and _blank(cvdp_col):
-                ws.cell(row=row_idx, column=cvdp_col, value=cvd_proxy_id)
-            return True
+    def _blank(col_idx: int | None) -> bool:
+        if col_idx is None:
+            return False
+        v = ws.cell(row=row_idx, column=col_idx).value
+        return v is None or str(v).strip() == ""
 
-    return False
+    if fpp_col and _blank(fpp_col):
+        ws.cell(row=row_idx, column=fpp_col, value=fp_proxy_id)
+    if cvdp_col and _blank(cvdp_col):
+        ws.cell(row=row_idx, column=cvdp_col, value=cvd_proxy_id)
+    return True
 
 
 def main() -> int:
@@ -209,40 +219,57 @@ def main() -> int:
             f"Workbook not found: {XLSX_PATH}. Run tools/admin/make_run_config_xlsx.py first."
         )
 
-    wb = load_workbook(XLSX_PATH)
-
     fp_proxy_id  = f"{instrument_id}_FOOTPRINT_PROXY_1M"
     cvd_proxy_id = f"{instrument_id}_CVD_PROXY_1M"
-
-    for row_data in [
+    dataset_rows = [
         _footprint_proxy_row(instrument_id, source_dataset_id),
         _cvd_proxy_row(instrument_id, source_dataset_id),
-    ]:
-        did = row_data["dataset_id"]
-        added = _add_row_if_missing(wb, row_data)
-        print(
-            f"Added {did} to DATASETS (source: {source_dataset_id})."
-            if added
-            else f"{did} already in DATASETS, skipping."
-        )
-
-    found = _update_instruments_row(wb, instrument_id, fp_proxy_id, cvd_proxy_id)
-    print(
-        f"Updated INSTRUMENTS {instrument_id} row: "
-        f"footprint_proxy_dataset_id={fp_proxy_id}, cvd_proxy_dataset_id={cvd_proxy_id}."
-        if found
-        else f"WARNING: {instrument_id} row not found in INSTRUMENTS - skipping instrument update."
-    )
-
-    wb.save(XLSX_PATH)
-    wb.close()
-    print(f"Workbook saved: {XLSX_PATH}")
-
-    subprocess.run(
-        [sys.executable, "tools/admin/export_config_snapshot.py"],
-        check=True,
-    )
-    print("Config snapshot re-exported.")
+    ]
+
+    # Decide from read-only scans; only a real change pays for the full
+    # (styles + cells) load and the save.
+    existing = config_tools.read_existing_ids(XLSX_PATH)
+    changed = False
+    wb = None
+    if (
+        existing is not None
+        and all(r["dataset_id"] in existing for r in dataset_rows)
+        and not _instrument_needs_update(XLSX_PATH, instrument_id)
+    ):
+        for row_data in dataset_rows:
+            print(f"{row_data['dataset_id']} already in DATASETS, skipping.")
+        print(f"INSTRUMENTS {instrument_id} proxy columns already set; workbook unchanged.")
+    else:
+        wb = load_workbook(XLSX_PATH)
+        try:
+            datasets = config_tools.sheet_ctx(wb, "DATASETS", "dataset_id")
+            instruments = config_tools.sheet_ctx(wb, "INSTRUMENTS", "instrument_id")
+            existing = existing or set()
+
+            for row_data in dataset_rows:
+                did = row_data["dataset_id"]
+                added = config_tools.add_row_if_missing(datasets, row_data, existing)
+                print(
+                    f"Added {did} to DATASETS (source: {source_dataset_id})."
+                    if added
+                    else f"{did} already in DATASETS, skipping."
+                )
+
+            found = _update_instruments_row(instruments, instrument_id, fp_proxy_id, cvd_proxy_id)
+            print(
+                f"Updated INSTRUMENTS {instrument_id} row: "
+                f"footprint_proxy_dataset_id={fp_proxy_id}, cvd_proxy_dataset_id={cvd_proxy_id}."
+                if found
+                else f"WARNING: {instrument_id} row not found in INSTRUMENTS - skipping instrument update."
+            )
+
+            wb.save(XLSX_PATH)
+        finally:
+            wb.close()
+        print(f"Workbook saved: {XLSX_PATH}")
+        changed = True
+
+    config_tools.export_after_edit(wb, changed)
     return 0
 
 
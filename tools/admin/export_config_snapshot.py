@@ -3,12 +3,25 @@ INSTRUCTION HEADER
 Purpose: Export the Excel control plane to JSON snapshots.
 Inputs: Reads `config/run_config.xlsx`.
 Outputs: Writes `config/exports/config_snapshot_<YYYYMMDD_HHMMSS>.json`
-and `config/exports/config_snapshot_latest.json`.
+and `config/exports/config_snapshot_latest.json` (each written to a .tmp file and
+renamed into place, so readers never see a half-written snapshot).
 How to run: `pybt tools/admin/export_config_snapshot.py`
 Also: `C:\\Users\\pcash\\anaconda3\\envs\\backtest\\python.exe tools\\admin\\export_config_snapshot.py`
 Success looks like: printed paths for the timestamped snapshot and latest snapshot.
+Tools that have just saved the workbook call main(rows_from_workbook(wb)) in-process
+instead, which skips reading the xlsx back.
+The config-editing tools reach it through tools/admin/_config_tools.py
+(export_after_edit, read_sheet_rows).
+Formula cells are exported as their formula text (e.g. "=1+1"), as openpyxl reads
+them; calamine is only used for workbooks with no formulas. The calamine cell
+rules and the formula check come from src/platform/config/xlsx_cells.py (loaded
+by path), the same code excel_io uses. They apply on every path (whole floats ->
+int, blank or whitespace-only text -> None, dates -> midnight datetime), so the
+snapshot is the same whichever backend or tool wrote it.
 Common failures and fixes:
 - Module not found (openpyxl or orjson): run `pybt -m pip install openpyxl orjson`.
+- Slow on a big workbook: `pybt -m pip install python-calamine` (used automatically
+  when installed; openpyxl is the fallback).
 - Missing workbook: run `pybt tools/admin/make_run_config_xlsx.py`.
 """
 
@@ -16,9 +29,144 @@ from __future__ import annotations
 
 from pathlib import Path
 import datetime as dt
+import importlib.util
 import json
+import math
+import os
+from types import ModuleType
+
+from typing import Any
+
+
+def _load_xlsx_cells() -> ModuleType:
+    """
+    Load src/platform/config/xlsx_cells.py by file path, so the export applies
+    exactly excel_io's cell rules. Importing it as platform.config.xlsx_cells
+    would clash with the stdlib `platform` module, which openpyxl imports.
+    """
+    path = Path(__file__).resolve().parents[2] / "src" / "platform" / "config" / "xlsx_cells.py"
+    spec = importlib.util.spec_from_file_location("xlsx_cells", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+xlsx_cells = _load_xlsx_cells()
+
+
+def _cell(v: Any) -> Any:
+    """
+    The shared calamine cell rules, applied on every read path of the export.
+    Whitespace-only text also becomes None: openpyxl saves it without
+    xml:space="preserve", so calamine reads it back as "".
+    """
+    v = xlsx_cells.calamine_cell(v)
+    if isinstance(v, str) and not v.strip():
+        return None
+    return v
+
+
+def _saved_cell(v: Any) -> Any:
+    """
+    An in-memory openpyxl value as it reads back once the workbook is saved.
+    openpyxl writes numbers as "%.16g" text (NaN/inf as empty) and reads that
+    text back as int or float; the shared cell rules then apply as on disk.
+    """
+    if isinstance(v, (int, float)) and not isinstance(v, bool):
+        text = "" if math.isnan(v) or math.isinf(v) else "%.16g" % v
+        if not text:
+            return None
+        v = float(text) if any(c in text for c in ".eE") else int(text)
+    return _cell(v)
+
+
+def _calamine_workbook(xlsx_path: Path):
+    """
+    A python-calamine workbook for xlsx_path, or None when calamine is not
+    installed or the workbook has formulas (calamine only sees their cached
+    results, not the formula text openpyxl returns).
+    """
+    try:
+        from python_calamine import CalamineWorkbook
+    except ImportError:
+        return None
+    if xlsx_cells.has_formulas(xlsx_path):
+        return None
+    return CalamineWorkbook.from_path(str(xlsx_path))
+
+
+def _calamine_rows(cwb, sheet_name: str) -> list[tuple[Any, ...]]:
+    return [
+        tuple(map(_cell, row))
+        for row in cwb.get_sheet_by_name(sheet_name).to_python(skip_empty_area=False)
+    ]
+
+
+def _read_workbook_rows(xlsx_path: Path) -> dict[str, list[tuple[Any, ...]]]:
+    """Return every sheet's rows (header row first), in workbook sheet order."""
+    cwb = _calamine_workbook(xlsx_path)
+    if cwb is not None:
+        return {name: _calamine_rows(cwb, name) for name in cwb.sheet_names}
+
+    from openpyxl import load_workbook
+
+    # The same cell rules as calamine (whole floats -> int, "" -> None), so
+    # both backends and rows_from_workbook give the same snapshot.
+    wb = load_workbook(xlsx_path, read_only=True)
+    try:
+        return {
+            ws.title: [tuple(map(_cell, row)) for row in ws.iter_rows(values_only=True)]
+            for ws in wb.worksheets
+        }
+    finally:
+        wb.close()
+
+
+def read_sheet_rows(xlsx_path: Path, sheet_name: str) -> list[tuple[Any, ...]] | None:
+    """
+    Every row of one sheet (header row first) as value tuples, read the same
+    way as the export, or None if the sheet is missing. The config tools use
+    this for read-only existence checks; their writes stay on openpyxl.
+    """
+    cwb = _calamine_workbook(xlsx_path)
+    if cwb is not None:
+        return _calamine_rows(cwb, sheet_name) if sheet_name in cwb.sheet_names else None
+
+    from openpyxl import load_workbook
+
+    wb = load_workbook(xlsx_path, read_only=True)
+    try:
+        if sheet_name not in wb.sheetnames:
+            return None
+        return [
+            tuple(map(_cell, row))
+            for row in wb[sheet_name].iter_rows(values_only=True)
+        ]
+    finally:
+        wb.close()
+
+
+def rows_from_workbook(wb) -> dict[str, list[tuple[Any, ...]]]:
+    """
+    Every sheet's rows from an openpyxl workbook a tool has just saved, as
+    _read_workbook_rows would read them back from disk with either backend
+    (formula cells keep their formula text; see _saved_cell).
+    """
+    return {
+        ws.title: [tuple(_saved_cell(c.value) for c in row) for row in ws.iter_rows()]
+        for ws in wb.worksheets
+    }
+
 
-from openpyxl import load_workbook
+def _write_atomic(path: Path, text: str) -> None:
+    """Write text to a .tmp sibling of path, then rename it over path."""
+    tmp_path = path.with_name(path.name + ".tmp")
+    try:
+        tmp_path.write_text(text, encoding="utf-8")
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
 
 
 def _repo_root() -> Path:
@@ -26,8 +174,13 @@ def _repo_root() -> Path:
     return Path(__file__).resolve().parents[2]
 
 
-def main() -> int:
-    """Export snapshots using the schema from the workbook itself."""
+def main(workbook_rows: dict[str, list[tuple[Any, ...]]] | None = None) -> int:
+    """
+    Export snapshots using the schema from the workbook itself.
+
+    workbook_rows: rows from rows_from_workbook, when the caller has the saved
+    workbook in memory; None reads config/run_config.xlsx.
+    """
     repo_root = _repo_root()
     xlsx_path = repo_root / "config" / "run_config.xlsx"
     exports_dir = repo_root / "config" / "exports"
@@ -37,14 +190,14 @@ def main() -> int:
     latest_path = exports_dir / "config_snapshot_latest.json"
     stamped_path = exports_dir / f"config_snapshot_{ts}.json"
 
-    wb = load_workbook(xlsx_path)
+    if workbook_rows is None:
+        workbook_rows = _read_workbook_rows(xlsx_path)
 
     schema: dict[str, list[str]] = {}
     sheets: dict[str, list[dict[str, object]]] = {}
 
-    for sheet_name in wb.sheetnames:
-        ws = wb[sheet_name]
-        header_row = [c.value for c in ws[1]]
+    for sheet_name, sheet_rows in workbook_rows.items():
+        header_row = list(sheet_rows[0]) if sheet_rows else []
         header = [h for h in header_row if h is not None and str(h).strip() != ""]
         if not header:
             raise ValueError(f"Missing header row in sheet: {sheet_name}")
@@ -59,7 +212,7 @@ def main() -> int:
             return True
 
         rows: list[dict[str, object]] = []
-        for row in ws.iter_rows(min_row=2, max_row=ws.max_row, values_only=True):
+        for row in sheet_rows[1:]:
             if _is_blank_row(list(row)):
                 continue
             record = {header[i]: row[i] if i < len(row) else None for i in range(len(header))}
@@ -75,8 +228,9 @@ def main() -> int:
         "sheets": sheets,
     }
 
-    stamped_path.write_text(json.dumps(payload, indent=2), encoding="utf-8")
-    latest_path.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+    text = json.dumps(payload, indent=2)
+    _write_atomic(stamped_path, text)
+    _write_atomic(latest_path, text)
 
     print(f"Wrote snapshot: {stamped_path}")
     print(f"Wrote latest : {latest_path}")
@@ -6,10 +6,11 @@ What this script does (plain English):
     big_trades_dataset_id, big_trades_proxy_dataset_id, big_trades_source_mode
 - Sets default values for any instrument row whose big-trade datasets already
   exist in the DATASETS sheet (e.g. ES_BIG_TRADES, ES_BIG_TRADES_PROXY for ES).
-- Re-exports the config snapshot.
+- Re-exports the config snapshot if anything changed.
 
 This is a one-time migration. Running it again is safe (idempotent - only adds
 missing columns; only sets values that are currently blank).
+A re-run with nothing to change does not rewrite the xlsx.
 
 Where to run:
 - Run from repo root: C:\\Users\\pcash\\OneDrive\\Backtest
@@ -17,10 +18,20 @@ Where to run:
 How to run:
   C:\\Users\\pcash\\anaconda3\\envs\\backtest\\python.exe tools\\admin\\migrate_run_config_add_big_trades_cols.py
 
+  # Re-export the snapshot even when nothing changed (both flags below
+  # act only when set to exactly 1):
+  set FORCE_EXPORT=1
+
+  # Chaining several config tools: skip each tool's export, then export once:
+  set BACKTEST_DEFER_EXPORT=1
+  (run the tools)
+  set BACKTEST_DEFER_EXPORT=
+  C:\\Users\\pcash\\anaconda3\\envs\\backtest\\python.exe tools\\admin\\export_config_snapshot.py
+
 What success looks like:
 - Prints the columns added (or "already present").
 - Prints each instrument row updated with its default values.
-- Prints "Config snapshot re-exported."
+- Prints "Config snapshot re-exported." (or "No changes; ..." on a re-run).
 
 Common failures + fixes:
 - Permission error on xlsx: close Excel if the workbook is open, then retry.
@@ -29,13 +40,25 @@ Common failures + fixes:
 
 from __future__ import annotations
 
-import subprocess
-import sys
+import importlib.util
 from pathlib import Path
+from types import ModuleType
 
 from openpyxl import load_workbook
 
 
+def _load_config_tools() -> ModuleType:
+    """Load tools/admin/_config_tools.py (helpers shared by the config tools) by file path."""
+    path = Path(__file__).resolve().parent / "_config_tools.py"
+    spec = importlib.util.spec_from_file_location("_config_tools", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+config_tools = _load_config_tools()
+
+
 XLSX_PATH = Path("config/run_config.xlsx")
 
 NEW_COLS = [
@@ -49,20 +72,20 @@ DEFAULT_BIG_TRADES_SOURCE_MODE = "real_then_proxy"
 
 def _add_missing_columns(ws) -> list[str]:
     """Append any missing NEW_COLS to the header row. Returns list of added cols."""
-    header = [c.value for c in ws[1]]
-    added = []
-    for col_name in NEW_COLS:
-        if col_name not in header:
-            # Insert before the existing 'notes' column if present, else append
-            if "notes" in header:
-                notes_idx = header.index("notes") + 1  # 1-based
-                ws.insert_cols(notes_idx)
-                ws.cell(row=1, column=notes_idx, value=col_name)
-                # refresh header list for subsequent insertions
-                header = [c.value for c in ws[1]]
-            else:
-                ws.cell(row=1, column=ws.max_column + 1, value=col_name)
-            added.append(col_name)
+    col_of = {c.value: c.column for c in ws[1] if c.value is not None}
+    added = [col_name for col_name in NEW_COLS if col_name not in col_of]
+    if not added:
+        return added
+    # Insert before the existing 'notes' column if present, else append
+    start = col_of.get("notes")
+    if start is not None:
+        # One insert_cols shifts notes and everything right of it once for
+        # all the new columns, instead of once per column.
+        ws.insert_cols(start, amount=len(added))
+    else:
+        start = ws.max_column + 1
+    for offset, col_name in enumerate(added):
+        ws.cell(row=1, column=start + offset, value=col_name)
     return added
 
 
@@ -76,9 +99,8 @@ def _get_dataset_ids(wb) -> set[str]:
         return set()
     id_col = headers.index("dataset_id") + 1
     return {
-        ws.cell(row=r, column=id_col).value
-        for r in range(2, ws.max_row + 2)
-        if ws.cell(row=r, column=id_col).value
+        v for (v,) in ws.iter_rows(min_row=2, min_col=id_col, max_col=id_col, values_only=True)
+        if v
     }
 
 
@@ -88,10 +110,9 @@ def _set_instrument_defaults(ws, dataset_ids: set[str]) -> list[str]:
     Only sets values if the referenced datasets actually exist in DATASETS.
     Returns a list of summary strings describing what was set.
     """
-    header = [c.value for c in ws[1]]
-
-    def col(name: str) -> int | None:
-        return (header.index(name) + 1) if name in header else None
+    # header name -> 1-based column, built once per sheet pass.
+    col_of = {c.value: c.column for c in ws[1] if c.value is not None}
+    col = col_of.get
 
     id_col = col("instrument_id")
     if id_col is None:
@@ -102,8 +123,10 @@ def _set_instrument_defaults(ws, dataset_ids: set[str]) -> list[str]:
     mode_col = col("big_trades_source_mode")
 
     updated = []
-    for row_idx in range(2, ws.max_row + 2):
-        iid = ws.cell(row=row_idx, column=id_col).value
+    # One Cell tuple per row: reads and writes below index into it instead of
+    # resolving ws.cell(row, column) per access.
+    for cells in ws.iter_rows(min_row=2):
+        iid = cells[id_col - 1].value
         if not iid:
             continue
 
@@ -115,12 +138,12 @@ def _set_instrument_defaults(ws, dataset_ids: set[str]) -> list[str]:
         def _blank(col_idx: int | None) -> bool:
             if col_idx is None:
                 return False
-            v = ws.cell(row=row_idx, column=col_idx).value
+            v = cells[col_idx - 1].value
             return v is None or str(v).strip() == ""
 
         def _set(col_idx: int | None, value: str) -> None:
             if col_idx is not None:
-                ws.cell(row=row_idx, column=col_idx, value=value)
+                cells[col_idx - 1].value = value
 
         if bt_id in dataset_ids and _blank(bt_col):
             _set(bt_col, bt_id)
@@ -148,40 +171,43 @@ def main() -> int:
         )
 
     wb = load_workbook(XLSX_PATH)
-
-    if "INSTRUMENTS" not in wb.sheetnames:
-        raise ValueError("Missing INSTRUMENTS sheet.")
-
-    ws = wb["INSTRUMENTS"]
-
-    # Step 1: add missing columns
-    added = _add_missing_columns(ws)
-    if added:
-        print(f"Added columns to INSTRUMENTS: {added}")
-    else:
-        print(f"All big-trade columns already present: {NEW_COLS}")
-
-    # Step 2: collect known dataset IDs
-    dataset_ids = _get_dataset_ids(wb)
-
-    # Step 3: set defaults for instrument rows
-    updated = _set_instrument_defaults(ws, dataset_ids)
-    if updated:
-        print("Set big-trade defaults:")
-        for line in updated:
-            print(line)
-    else:
-        print("No instrument rows updated (all already set or no matching datasets found).")
-
-    wb.save(XLSX_PATH)
-    wb.close()
-    print(f"Workbook saved: {XLSX_PATH}")
-
-    subprocess.run(
-        [sys.executable, "tools/admin/export_config_snapshot.py"],
-        check=True,
-    )
-    print("Config snapshot re-exported.")
+    try:
+        if "INSTRUMENTS" not in wb.sheetnames:
+            raise ValueError("Missing INSTRUMENTS sheet.")
+
+        ws = wb["INSTRUMENTS"]
+
+        # Step 1: add missing columns
+        added = _add_missing_columns(ws)
+        if added:
+            print(f"Added columns to INSTRUMENTS: {added}")
+        else:
+            print(f"All big-trade columns already present: {NEW_COLS}")
+
+        # Step 2: collect known dataset IDs
+        dataset_ids = _get_dataset_ids(wb)
+
+        # Step 3: set defaults for instrument rows
+        updated = _set_instrument_defaults(ws, dataset_ids)
+        if updated:
+            print("Set big-trade defaults:")
+            for line in updated:
+                print(line)
+        else:
+            print("No instrument rows updated (all already set or no matching datasets found).")
+
+        # Saving re-serializes the whole workbook; a re-run that changed nothing
+        # leaves the file alone.
+        changed = bool(added or updated)
+        if changed:
+            wb.save(XLSX_PATH)
+            print(f"Workbook saved: {XLSX_PATH}")
+        else:
+            print("No changes; skipping save.")
+    finally:
+        wb.close()
+
+    config_tools.export_after_edit(wb, changed)
     return 0
 
 
@@ -7,10 +7,11 @@ What this script does (plain English):
     cvd_dataset_id, cvd_proxy_dataset_id, metric_source_mode
 - Sets default values for the ES row (and any other instrument rows that have
   a matching FOOTPRINT_1M / CVD_1M dataset in the DATASETS sheet).
-- Re-exports the config snapshot.
+- Re-exports the config snapshot if anything changed.
 
 This is a one-time migration. Running it again is safe (idempotent - only adds
 missing columns; only sets values that are currently blank).
+A re-run with nothing to change does not rewrite the xlsx.
 
 Where to run:
 - Run from repo root: C:\\Users\\pcash\\OneDrive\\Backtest
@@ -18,10 +19,20 @@ Where to run:
 How to run:
   C:\\Users\\pcash\\anaconda3\\envs\\backtest\\python.exe tools\\admin\\migrate_run_config_add_metric_source_cols.py
 
+  # Re-export the snapshot even when nothing changed (both flags below
+  # act only when set to exactly 1):
+  set FORCE_EXPORT=1
+
+  # Chaining several config tools: skip each tool's export, then export once:
+  set BACKTEST_DEFER_EXPORT=1
+  (run the tools)
+  set BACKTEST_DEFER_EXPORT=
+  C:\\Users\\pcash\\anaconda3\\envs\\backtest\\python.exe tools\\admin\\export_config_snapshot.py
+
 What success looks like:
 - Prints the columns added (or "already present").
 - Prints each instrument row updated with its default values.
-- Prints "Config snapshot re-exported."
+- Prints "Config snapshot re-exported." (or "No changes; ..." on a re-run).
 
 Common failures + fixes:
 - Permission error on xlsx: close Excel if the workbook is open, then retry.
@@ -30,13 +41,25 @@ Common failures + fixes:
 
 from __future__ import annotations
 
-import subprocess
-import sys
+import importlib.util
 from pathlib import Path
+from types import ModuleType
 
 from openpyxl import load_workbook
 
 
+def _load_config_tools() -> ModuleType:
+    """Load tools/admin/_config_tools.py (helpers shared by the config tools) by file path."""
+    path = Path(__file__).resolve().parent / "_config_tools.py"
+    spec = importlib.util.spec_from_file_location("_config_tools", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+config_tools = _load_config_tools()
+
+
 XLSX_PATH = Path("config/run_config.xlsx")
 
 NEW_COLS = [
@@ -52,7 +75,7 @@ DEFAULT_METRIC_SOURCE_MODE = "real_then_proxy"
 
 def _add_missing_columns(ws) -> list[str]:
     """Append any missing NEW_COLS to the header row. Returns list of added cols."""
-    header = [c.value for c in ws[1]]
+    header = {c.value for c in ws[1]}
     added = []
     for col_name in NEW_COLS:
         if col_name not in header:
@@ -71,9 +94,8 @@ def _get_dataset_ids(wb) -> set[str]:
         return set()
     id_col = headers.index("dataset_id") + 1
     return {
-        ws.cell(row=r, column=id_col).value
-        for r in range(2, ws.max_row + 2)
-        if ws.cell(row=r, column=id_col).value
+        v for (v,) in ws.iter_rows(min_row=2, min_col=id_col, max_col=id_col, values_only=True)
+        if v
     }
 
 
@@ -83,10 +105,9 @@ def _set_instrument_defaults(ws, dataset_ids: set[str]) -> list[str]:
     Only sets values if the referenced datasets actually exist in DATASETS.
     Returns a list of summary strings describing what was set.
     """
-    header = [c.value for c in ws[1]]
-
-    def col(name: str) -> int | None:
-        return (header.index(name) + 1) if name in header else None
+    # header name -> 1-based column, built once per sheet pass.
+    col_of = {c.value: c.column for c in ws[1] if c.value is not None}
+    col = col_of.get
 
     id_col = col("instrument_id")
     if id_col is None:
@@ -99,8 +120,10 @@ def _set_instrument_defaults(ws, dataset_ids: set[str]) -> list[str]:
     mode_col = col("metric_source_mode")
 
     updated = []
-    for row_idx in range(2, ws.max_row + 2):
-        iid = ws.cell(row=row_idx, column=id_col).value
+    # One Cell tuple per row: reads and writes below index into it instead of
+    # resolving ws.cell(row, column) per access.
+    for cells in ws.iter_rows(min_row=2):
+        iid = cells[id_col - 1].value
         if not iid:
             continue
 
@@ -114,12 +137,12 @@ def _set_instrument_defaults(ws, dataset_ids: set[str]) -> list[str]:
         def _blank(col_idx: int | None) -> bool:
             if col_idx is None:
                 return False
-            v = ws.cell(row=row_idx, column=col_idx).value
+            v = cells[col_idx - 1].value
             return v is None or str(v).strip() == ""
 
         def _set(col_idx: int | None, value: str) -> None:
             if col_idx is not None:
-                ws.cell(row=row_idx, column=col_idx, value=value)
+                cells[col_idx - 1].value = value
 
         if fp_id in dataset_ids and _blank(fp_col):
             _set(fp_col, fp_id)
@@ -158,40 +181,43 @@ def main() -> int:
         )
 
     wb = load_workbook(XLSX_PATH)
-
-    if "INSTRUMENTS" not in wb.sheetnames:
-        raise ValueError("Missing INSTRUMENTS sheet.")
-
-    ws = wb["INSTRUMENTS"]
-
-    # Step 1: add missing columns
-    added = _add_missing_columns(ws)
-    if added:
-        print(f"Added columns to INSTRUMENTS: {added}")
-    else:
-        print(f"All metric-source columns already present: {NEW_COLS}")
-
-    # Step 2: collect known dataset IDs
-    dataset_ids = _get_dataset_ids(wb)
-
-    # Step 3: set defaults for instrument rows
-    updated = _set_instrument_defaults(ws, dataset_ids)
-    if updated:
-        print("Set metric-source defaults:")
-        for line in updated:
-            print(line)
-    else:
-        print("No instrument rows updated (all already set or no matching datasets found).")
-
-    wb.save(XLSX_PATH)
-    wb.close()
-    print(f"Workbook saved: {XLSX_PATH}")
-
-    subprocess.run(
-        [sys.executable, "tools/admin/export_config_snapshot.py"],
-        check=True,
-    )
-    print("Config snapshot re-exported.")
+    try:
+        if "INSTRUMENTS" not in wb.sheetnames:
+            raise ValueError("Missing INSTRUMENTS sheet.")
+
+        ws = wb["INSTRUMENTS"]
+
+        # Step 1: add missing columns
+        added = _add_missing_columns(ws)
+        if added:
+            print(f"Added columns to INSTRUMENTS: {added}")
+        else:
+            print(f"All metric-source columns already present: {NEW_COLS}")
+
+        # Step 2: collect known dataset IDs
+        dataset_ids = _get_dataset_ids(wb)
+
+        # Step 3: set defaults for instrument rows
+        updated = _set_instrument_defaults(ws, dataset_ids)
+        if updated:
+            print("Set metric-source defaults:")
+            for line in updated:
+                print(line)
+        else:
+            print("No instrument rows updated (all already set or no matching datasets found).")
+
+        # Saving re-serializes the whole workbook; a re-run that changed nothing
+        # leaves the file alone.
+        changed = bool(added or updated)
+        if changed:
+            wb.save(XLSX_PATH)
+            print(f"Workbook saved: {XLSX_PATH}")
+        else:
+            print("No changes; skipping save.")
+    finally:
+        wb.close()
+
+    config_tools.export_after_edit(wb, changed)
     return 0
 
 
@@ -13,10 +13,11 @@ What this script does (plain English):
     ES_BIG_TRADES_PROXY: threshold_method=fixed_count, threshold_min_size=100
 - Cleans the stale threshold_method / min_size values out of the notes field for
   big_trades rows (leaves instrument_id: ES intact).
-- Re-exports the config snapshot.
+- Re-exports the config snapshot if anything changed.
 
 This is a one-time migration. Running it again is safe (idempotent — only adds
 missing columns; only sets values that are currently blank).
+A re-run with nothing to change does not rewrite the xlsx.
 
 Where to run:
 - Run from repo root: C:\\Users\\pcash\\OneDrive\\Backtest
@@ -24,10 +25,20 @@ Where to run:
 How to run:
   C:\\Users\\pcash\\anaconda3\\envs\\backtest\\python.exe tools\\admin\\migrate_run_config_add_threshold_cols.py
 
+  # Re-export the snapshot even when nothing changed (both flags below
+  # act only when set to exactly 1):
+  set FORCE_EXPORT=1
+
+  # Chaining several config tools: skip each tool's export, then export once:
+  set BACKTEST_DEFER_EXPORT=1
+  (run the tools)
+  set BACKTEST_DEFER_EXPORT=
+  C:\\Users\\pcash\\anaconda3\\envs\\backtest\\python.exe tools\\admin\\export_config_snapshot.py
+
 What success looks like:
 - Prints the columns added (or "already present").
 - Prints each DATASETS row updated with default values.
-- Prints "Config snapshot re-exported."
+- Prints "Config snapshot re-exported." (or "No changes; ..." on a re-run).
 
 Common failures + fixes:
 - Permission error on xlsx: close Excel if the workbook is open, then retry.
@@ -37,13 +48,25 @@ Common failures + fixes:
 from __future__ import annotations
 
 import re
-import subprocess
-import sys
+import importlib.util
 from pathlib import Path
+from types import ModuleType
 
 from openpyxl import load_workbook
 
 
+def _load_config_tools() -> ModuleType:
+    """Load tools/admin/_config_tools.py (helpers shared by the config tools) by file path."""
+    path = Path(__file__).resolve().parent / "_config_tools.py"
+    spec = importlib.util.spec_from_file_location("_config_tools", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+config_tools = _load_config_tools()
+
+
 XLSX_PATH = Path("config/run_config.xlsx")
 
 NEW_COLS = [
@@ -71,37 +94,39 @@ BIG_TRADES_PROXY_DEFAULTS = {
 }
 
 # Notes lines to strip out of big_trades rows (now promoted to columns)
+# One pass over the notes: a threshold_method / min_size line (with the
+# newlines after it) is dropped, any other run of 2+ newlines becomes one.
 _NOTES_STRIP = re.compile(
-    r"^\s*(threshold_method|min_size)\s*:.*$", re.MULTILINE
+    r"(?P<line>^\s*(?:threshold_method|min_size)\s*:.*$\n*)|\n{2,}", re.MULTILINE
 )
 
 
 def _add_missing_columns(ws) -> list[str]:
     """Append any missing NEW_COLS to the DATASETS header row before 'notes'.
     Returns list of added cols."""
-    header = [c.value for c in ws[1]]
-    added = []
-    for col_name in NEW_COLS:
-        if col_name not in header:
-            if "notes" in header:
-                notes_idx = header.index("notes") + 1  # 1-based
-                ws.insert_cols(notes_idx)
-                ws.cell(row=1, column=notes_idx, value=col_name)
-                header = [c.value for c in ws[1]]
-            else:
-                ws.cell(row=1, column=ws.max_column + 1, value=col_name)
-            added.append(col_name)
+    col_of = {c.value: c.column for c in ws[1] if c.value is not None}
+    added = [col_name for col_name in NEW_COLS if col_name not in col_of]
+    if not added:
+        return added
+    start = col_of.get("notes")
+    if start is not None:
+        # One insert_cols shifts notes and everything right of it once for
+        # all the new columns, instead of once per column.
+        ws.insert_cols(start, amount=len(added))
+    else:
+        start = ws.max_column + 1
+    for offset, col_name in enumerate(added):
+        ws.cell(row=1, column=start + offset, value=col_name)
     return added
 
 
 def _clean_notes(notes_val: str | None) -> str:
     """Strip threshold_method / min_size lines from notes (now in columns)."""
     if not notes_val:
-        return notes_val or ""
-    cleaned = _NOTES_STRIP.sub("", notes_val or "")
-    # Collapse multiple blank lines
-    cleaned = re.sub(r"\n{2,}", "\n", cleaned).strip()
-    return cleaned
+        return ""
+    if "threshold_method" not in notes_val and "min_size" not in notes_val and "\n\n" not in notes_val:
+        return notes_val.strip()
+    return _NOTES_STRIP.sub(lambda m: "" if m.group("line") else "\n", notes_val).strip()
 
 
 def _set_dataset_defaults(ws) -> list[str]:
@@ -110,10 +135,9 @@ def _set_dataset_defaults(ws) -> list[str]:
     column defaults if currently blank and clean the notes field.
     Returns summary lines.
     """
-    header = [c.value for c in ws[1]]
-
-    def col(name: str) -> int | None:
-        return (header.index(name) + 1) if name in header else None
+    # header name -> 1-based column, built once per sheet pass.
+    col_of = {c.value: c.column for c in ws[1] if c.value is not None}
+    col = col_of.get
 
     id_col   = col("dataset_id")
     type_col = col("dataset_type")
@@ -121,22 +145,24 @@ def _set_dataset_defaults(ws) -> list[str]:
     if id_col is None:
         return []
 
-    def _blank(col_idx: int | None, row: int) -> bool:
+    def _blank(col_idx: int | None, cells) -> bool:
         if col_idx is None:
             return False
-        v = ws.cell(row=row, column=col_idx).value
+        v = cells[col_idx - 1].value
         return v is None or str(v).strip() == ""
 
-    def _set(col_idx: int | None, row: int, value) -> None:
+    def _set(col_idx: int | None, cells, value) -> None:
         if col_idx is not None and value is not None:
-            ws.cell(row=row, column=col_idx, value=value)
+            cells[col_idx - 1].value = value
 
     updated = []
-    for row_idx in range(2, ws.max_row + 2):
-        did = ws.cell(row=row_idx, column=id_col).value
+    # One Cell tuple per row: reads and writes below index into it instead of
+    # resolving ws.cell(row, column) per access.
+    for cells in ws.iter_rows(min_row=2):
+        did = cells[id_col - 1].value
         if not did:
             continue
-        dtype = ws.cell(row=row_idx, column=type_col).value if type_col else None
+        dtype = cells[type_col - 1].value if type_col else None
         if dtype not in ("big_trades", "big_trades_proxy"):
             continue
 
@@ -147,17 +173,17 @@ def _set_dataset_defaults(ws) -> list[str]:
         changes = {}
         for field, default_val in defaults.items():
             c = col(field)
-            if _blank(c, row_idx):
-                _set(c, row_idx, default_val)
+            if _blank(c, cells):
+                _set(c, cells, default_val)
                 if default_val is not None:
                     changes[field] = default_val
 
         # Clean stale threshold info out of notes
         if notes_col is not None:
-            raw = ws.cell(row=row_idx, column=notes_col).value
+            raw = cells[notes_col - 1].value
             cleaned = _clean_notes(raw)
             if cleaned != (raw or ""):
-                ws.cell(row=row_idx, column=notes_col, value=cleaned or None)
+                cells[notes_col - 1].value = cleaned or None
                 changes["notes"] = "(threshold lines removed)"
 
         if changes:
@@ -173,37 +199,40 @@ def main() -> int:
         )
 
     wb = load_workbook(XLSX_PATH)
-
-    if "DATASETS" not in wb.sheetnames:
-        raise ValueError("Missing DATASETS sheet.")
-
-    ws = wb["DATASETS"]
-
-    # Step 1: add missing columns
-    added = _add_missing_columns(ws)
-    if added:
-        print(f"Added columns to DATASETS: {added}")
-    else:
-        print(f"All threshold columns already present: {NEW_COLS}")
-
-    # Step 2: set defaults for big_trades rows
-    updated = _set_dataset_defaults(ws)
-    if updated:
-        print("Set threshold defaults:")
-        for line in updated:
-            print(line)
-    else:
-        print("No DATASETS rows updated (all already set or no big_trades rows found).")
-
-    wb.save(XLSX_PATH)
-    wb.close()
-    print(f"Workbook saved: {XLSX_PATH}")
-
-    subprocess.run(
-        [sys.executable, "tools/admin/export_config_snapshot.py"],
-        check=True,
-    )
-    print("Config snapshot re-exported.")
+    try:
+        if "DATASETS" not in wb.sheetnames:
+            raise ValueError("Missing DATASETS sheet.")
+
+        ws = wb["DATASETS"]
+
+        # Step 1: add missing columns
+        added = _add_missing_columns(ws)
+        if added:
+            print(f"Added columns to DATASETS: {added}")
+        else:
+            print(f"All threshold columns already present: {NEW_COLS}")
+
+        # Step 2: set defaults for big_trades rows
+        updated = _set_dataset_defaults(ws)
+        if updated:
+            print("Set threshold defaults:")
+            for line in updated:
+                print(line)
+        else:
+            print("No DATASETS rows updated (all already set or no big_trades rows found).")
+
+        # Saving re-serializes the whole workbook; a re-run that changed nothing
+        # leaves the file alone.
+        changed = bool(added or updated)
+        if changed:
+            wb.save(XLSX_PATH)
+            print(f"Workbook saved: {XLSX_PATH}")
+        else:
+            print("No changes; skipping save.")
+    finally:
+        wb.close()
+
+    config_tools.export_after_edit(wb, changed)
     return 0
 
 
@@ -0,0 +1,196 @@
+"""
+INSTRUCTION HEADER
+
+What this script does (plain English):
+- Builds small per-date "size statistics" sidecars for the big-trades datasets, so
+  rolling_pct / z_score thresholds can be computed without scanning the canonical parquet.
+- Reads all DATASETS rows with dataset_type='big_trades' or 'big_trades_proxy' from the
+  config snapshot (instrument-agnostic: ES, NQ, or any future instrument).
+- For each date partition: runs the same event SQL that get_big_trades uses (real trades,
+  or BVC proxy events from 1s OHLCV) and stores a histogram of event sizes.
+- Incremental: skips dates whose sidecar is newer than the partition's parquet files.
+- The sidecars are optional. get_big_trades uses them only when every lookback date has a
+  fresh one and falls back to scanning otherwise, so deleting them is always safe.
+
+Where to run:
+- Run from repo root: C:\\Users\\pcash\\OneDrive\\Backtest
+
+Inputs:
+- config/exports/config_snapshot_latest.json
+- E:\\BacktestData\\canonical\\es_trades\\{FULL|RTH}\\{date}\\part-*.parquet      (big_trades)
+- E:\\BacktestData\\canonical\\es_ohlcv_1s\\{FULL|RTH}\\{date}\\part-*.parquet    (big_trades_proxy)
+
+Outputs:
+- E:\\BacktestData\\canonical\\es_trades\\stats\\{FULL|RTH}\\{date}.parquet
+  Schema: utc_date (date), size (int64), n (int64)   one row per (UTC date, event size)
+
+How to run:
+  # Normal incremental run:
+  C:\\Users\\pcash\\anaconda3\\envs\\backtest\\python.exe tools\\build\\build_big_trades_stats.py
+
+  # Rebuild every sidecar:
+  C:\\Users\\pcash\\anaconda3\\envs\\backtest\\python.exe tools\\build\\build_big_trades_stats.py --force-rebuild
+
+  # Only one dataset:
+  C:\\Users\\pcash\\anaconda3\\envs\\backtest\\python.exe tools\\build\\build_big_trades_stats.py --dataset-id ES_BIG_TRADES
+
+What success looks like:
+- Prints per-session counts and "DONE" at the end.
+- Files exist at: E:\\BacktestData\\canonical\\es_trades\\stats\\RTH\\2025-12-01.parquet
+
+Common failures + fixes:
+- "No big_trades rows found": run tools/admin/add_big_trades_config.py first.
+- "No source dates found": run the matching ingest script first.
+- pyarrow missing: pip install pyarrow in the backtest conda env.
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib.util
+import sys
+from pathlib import Path
+from types import ModuleType
+from typing import Any
+
+
+DATASET_TYPES = ("big_trades", "big_trades_proxy")
+
+
+def _load_big_trades() -> ModuleType:
+    """
+    Load src/platform/data/big_trades.py by file path.
+
+    The sidecars must be built with exactly the event SQL the reader uses.
+    Importing it as platform.data.big_trades would clash with the stdlib
+    `platform` module, which duckdb/pandas have already imported.
+    """
+    path = Path(__file__).resolve().parents[2] / "src" / "platform" / "data" / "big_trades.py"
+    spec = importlib.util.spec_from_file_location("big_trades", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _progress_iter(items: list[str], desc: str):
+    try:
+        from tqdm import tqdm
+        return tqdm(items, desc=desc, unit="day")
+    except ImportError:
+        total = len(items)
+
+        class _Fallback:
+            def __iter__(self_):
+                for i, item in enumerate(items, 1):
+                    print(f"  [{desc}] {i}/{total}: {item}", flush=True)
+                    yield item
+
+        return _Fallback()
+
+
+def _process_dataset(
+    bt: ModuleType,
+    snapshot: dict[str, Any],
+    dataset_row: dict[str, Any],
+    data_root: Path,
+    force_rebuild: bool,
+) -> None:
+    dataset_id    = dataset_row["dataset_id"]
+    source_id     = (dataset_row.get("source_path_or_id") or "").strip()
+    instrument_id = bt._parse_notes(dataset_row.get("notes")).get("instrument_id", "").strip()
+
+    if not instrument_id:
+        raise ValueError(f"{dataset_id}: missing 'instrument_id' in DATASETS notes.")
+    if not source_id:
+        raise ValueError(f"{dataset_id}: missing source_path_or_id (should be source dataset_id).")
+
+    source_row = bt._find_dataset_by_id(snapshot, source_id)
+    canon_root = bt._canonical_root(
+        data_root, source_row.get("canonical_table_name", ""), instrument_id,
+    )
+    if dataset_row.get("dataset_type") == "big_trades_proxy":
+        events_sql_for = bt._proxy_events_sql
+    else:
+        events_sql_for = bt._real_events_sql
+
+    print(f"\n{'='*60}", flush=True)
+    print(f"  Dataset : {dataset_id}  (instrument={instrument_id})", flush=True)
+    print(f"  Source  : {canon_root}", flush=True)
+    print(f"  Output  : {canon_root / 'stats'}", flush=True)
+    print(f"{'='*60}", flush=True)
+
+    con = bt._get_con().cursor()
+    try:
+        for session in bt.SESSIONS:
+            source_dates = bt._list_available_dates(canon_root, session)
+            if not source_dates:
+                print(f"  [{session}] No source dates found — skipping.", flush=True)
+                continue
+
+            to_build = [
+                d for d in source_dates
+                if force_rebuild or not bt._size_stats_fresh(canon_root, session, d)
+            ]
+            print(
+                f"\n  [{session}] source={len(source_dates)}  to_build={len(to_build)}",
+                flush=True,
+            )
+            if not to_build:
+                print(f"  [{session}] All sidecars up to date (use --force-rebuild to redo).", flush=True)
+                continue
+
+            written = 0
+            for date_str in _progress_iter(to_build, f"{dataset_id}/{session}"):
+                if bt._write_size_stats(canon_root, session, date_str, events_sql_for, con):
+                    written += 1
+            print(f"  [{session}] Sidecars written: {written}", flush=True)
+    finally:
+        con.close()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Build per-date event-size sidecars for big-trades thresholds."
+    )
+    parser.add_argument(
+        "--force-rebuild",
+        action="store_true",
+        help="Rewrite every sidecar, even ones newer than their source partition.",
+    )
+    parser.add_argument(
+        "--dataset-id",
+        default=None,
+        metavar="ID",
+        help="Only process this specific dataset_id (default: all big_trades rows).",
+    )
+    args = parser.parse_args()
+
+    bt = _load_big_trades()
+    snapshot  = bt._load_snapshot_if_needed(None)
+    data_root = Path(bt._active_paths(snapshot)["DATA_ROOT"])
+
+    rows = [
+        r for r in snapshot.get("sheets", {}).get("DATASETS", []) or []
+        if r.get("dataset_type") in DATASET_TYPES
+    ]
+    if args.dataset_id:
+        rows = [r for r in rows if r.get("dataset_id") == args.dataset_id]
+    if not rows:
+        print(
+            "ERROR: No big_trades rows found"
+            + (f" for dataset_id={args.dataset_id!r}" if args.dataset_id else "")
+            + ".\nRun tools/admin/add_big_trades_config.py first.",
+            file=sys.stderr,
+        )
+        return 1
+
+    print(f"Big-trades datasets to process: {[r['dataset_id'] for r in rows]}", flush=True)
+    for row in rows:
+        _process_dataset(bt, snapshot, row, data_root, args.force_rebuild)
+
+    print("\nDONE", flush=True)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -143,6 +143,11 @@ def _built_dates(root: Path, session: str) -> set[str]:
     return {d for d in os.listdir(session_dir) if (session_dir / d).is_dir()}
 
 
+def _file_list_sql(files: list[Path]) -> str:
+    """Format paths as a DuckDB list literal (forward slashes, quotes escaped)."""
+    return "['" + "', '".join(p.as_posix().replace("'", "''") for p in files) + "']"
+
+
 # ---------------------------------------------------------------------------
 # DuckDB aggregation
 # ---------------------------------------------------------------------------
@@ -161,7 +166,7 @@ def _aggregate_1m(parquet_files: list[Path], con: duckdb.DuckDBPyConnection) ->
 
     Returns a PyArrow Table sorted by (bar_time, symbol).
     """
-    file_list = "[" + ", ".join(f"'{str(p).replace(chr(92), '/')}'" for p in parquet_files) + "]"
+    file_list = _file_list_sql(parquet_files)
 
     sql = f"""
     SELECT
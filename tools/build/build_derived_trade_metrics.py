@@ -159,6 +159,11 @@ def _built_dates(root: Path, session: str) -> set[str]:
     return {d for d in os.listdir(session_dir) if (session_dir / d).is_dir()}
 
 
+def _file_list_sql(files: list[Path]) -> str:
+    """Format paths as a DuckDB list literal (forward slashes, quotes escaped)."""
+    return "['" + "', '".join(p.as_posix().replace("'", "''") for p in files) + "']"
+
+
 # ---------------------------------------------------------------------------
 # DuckDB aggregations
 # ---------------------------------------------------------------------------
@@ -175,11 +180,7 @@ def _build_footprint(
 
     Columns: bar_time, symbol, price, buy_volume, sell_volume, trade_count
     """
-    file_list = (
-        "["
-        + ", ".join(f"'{str(p).replace(chr(92), '/')}'" for p in parquet_files)
-        + "]"
-    )
+    file_list = _file_list_sql(parquet_files)
 
     sql = f"""
     SELECT
@@ -213,11 +214,7 @@ def _build_cvd(
 
     Columns: bar_time, symbol, buy_volume, sell_volume, delta, trade_count
     """
-    file_list = (
-        "["
-        + ", ".join(f"'{str(p).replace(chr(92), '/')}'" for p in parquet_files)
-        + "]"
-    )
+    file_list = _file_list_sql(parquet_files)
 
     sql = f"""
     SELECT
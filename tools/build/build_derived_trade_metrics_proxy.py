@@ -171,6 +171,11 @@ def _built_dates(root: Path, session: str) -> set[str]:
     return {d for d in os.listdir(session_dir) if (session_dir / d).is_dir()}
 
 
+def _file_list_sql(files: list[Path]) -> str:
+    """Format paths as a DuckDB list literal (forward slashes, quotes escaped)."""
+    return "['" + "', '".join(p.as_posix().replace("'", "''") for p in files) + "']"
+
+
 # ---------------------------------------------------------------------------
 # BVC aggregations
 # ---------------------------------------------------------------------------
@@ -190,11 +195,7 @@ def _build_footprint_proxy(
 
     Columns: bar_time, symbol, price, buy_volume, sell_volume, trade_count
     """
-    file_list = (
-        "["
-        + ", ".join(f"'{str(p).replace(chr(92), '/')}'" for p in parquet_files)
-        + "]"
-    )
+    file_list = _file_list_sql(parquet_files)
 
     sql = f"""
     WITH bvc AS (
@@ -204,59 +205,43 @@ def _build_footprint_proxy(
             high,
             low,
             CAST(volume AS BIGINT)                                 AS volume,
-            CASE
+            CAST(ROUND(CAST(volume AS BIGINT) * CASE
                 WHEN high = low
                     THEN 0.5
                 ELSE CAST((close - low) AS DOUBLE)
                    / CAST((high  - low) AS DOUBLE)
-            END                                                    AS buy_frac
+            END) AS BIGINT)                                        AS buy_volume
         FROM read_parquet({file_list})
         WHERE volume > 0
     ),
     price_rows AS (
-        -- Doji: single price level (high = low), 50/50 split
-        SELECT
-            bar_time,
-            symbol,
-            high                                          AS price,
-            CAST(ROUND(volume * buy_frac) AS BIGINT)     AS buy_volume,
-            CAST(volume - ROUND(volume * buy_frac) AS BIGINT) AS sell_volume
-        FROM bvc
-        WHERE high = low
-
-        UNION ALL
-
-        -- Non-doji: buy volume attributed to the high price
+        -- One pass over bvc, one or two price levels per bar:
+        --   doji (high = low): a single level, 50/50 split;
+        --   non-doji: buy volume at the high price, sell volume at the low.
+        -- A NULL high/low matches neither branch and unnests to no rows.
         SELECT
             bar_time,
             symbol,
-            high                                          AS price,
-            CAST(ROUND(volume * buy_frac) AS BIGINT)     AS buy_volume,
-            CAST(0 AS BIGINT)                             AS sell_volume
+            UNNEST(CASE
+                WHEN high = low THEN [
+                    {{'price': high, 'buy_volume': buy_volume,       'sell_volume': volume - buy_volume}}
+                ]
+                WHEN high != low THEN [
+                    {{'price': high, 'buy_volume': buy_volume,       'sell_volume': CAST(0 AS BIGINT)}},
+                    {{'price': low,  'buy_volume': CAST(0 AS BIGINT), 'sell_volume': volume - buy_volume}}
+                ]
+            END)                                                   AS level
         FROM bvc
-        WHERE high != low
-
-        UNION ALL
-
-        -- Non-doji: sell volume attributed to the low price
-        SELECT
-            bar_time,
-            symbol,
-            low                                           AS price,
-            CAST(0 AS BIGINT)                             AS buy_volume,
-            CAST(volume - ROUND(volume * buy_frac) AS BIGINT) AS sell_volume
-        FROM bvc
-        WHERE high != low
     )
     SELECT
         bar_time,
         symbol,
-        price,
-        CAST(SUM(buy_volume)  AS BIGINT)  AS buy_volume,
-        CAST(SUM(sell_volume) AS BIGINT)  AS sell_volume,
-        CAST(COUNT(*)         AS INTEGER) AS trade_count
+        level.price                                AS price,
+        CAST(SUM(level.buy_volume)  AS BIGINT)     AS buy_volume,
+        CAST(SUM(level.sell_volume) AS BIGINT)     AS sell_volume,
+        CAST(COUNT(*)               AS INTEGER)    AS trade_count
     FROM price_rows
-    GROUP BY bar_time, symbol, price
+    GROUP BY bar_time, symbol, level.price
     ORDER BY bar_time, symbol, price
     """
     table = con.execute(sql).fetch_arrow_table()
@@ -279,11 +264,7 @@ def _build_cvd_proxy(
 
     Columns: bar_time, symbol, buy_volume, sell_volume, delta, trade_count
     """
-    file_list = (
-        "["
-        + ", ".join(f"'{str(p).replace(chr(92), '/')}'" for p in parquet_files)
-        + "]"
-    )
+    file_list = _file_list_sql(parquet_files)
 
     sql = f"""
     WITH bvc AS (
@@ -5,6 +5,7 @@ What this file does (plain English):
 - Canonicalizes Databento trade-level DBN files into partitioned parquet (FULL and RTH sessions).
 - Instrument-agnostic: works for ES, NQ, or any future instrument via --instrument-id CLI arg.
 - Reads the source DBN glob path from DATASETS.source_path_or_id in config snapshot.
+- Adds a derived boolean column is_spread (symbol contains '-') next to the DBN columns.
 
 Where to run:
 - Run from repo root: C:\\Users\\pcash\\OneDrive\\Backtest
@@ -139,6 +140,9 @@ def _validate_and_cast(df: pd.DataFrame) -> pd.DataFrame:
     df["sequence"] = df["sequence"].astype("int64")
     df["flags"] = df["flags"].astype("int64")
     df["symbol"] = df["symbol"].astype("string")
+    # Calendar spreads carry a '-' in the symbol (e.g. "ESH5-ESM5"). Persisting
+    # the flag lets readers filter on a boolean column instead of LIKE '%-%'.
+    df["is_spread"] = df["symbol"].str.contains("-", regex=False).fillna(False).astype("bool")
 
     return df
 
@@ -16,7 +16,7 @@ Technical summary:
 Inputs:
 - Uses paths under E:\\BacktestData (SSD).
 - Reads the Excel workbook at config\\run_config.xlsx (the “control plane”).
-- Calls: tools\\verify\\verify_run_config_xlsx.py and tools\\admin\\export_config_snapshot.py
+- Calls (in-process): tools\\verify\\verify_run_config_xlsx.py and tools\\admin\\export_config_snapshot.py
 
 Outputs:
 - Creates folders under E:\\BacktestData\\... (raw, canonical, derived, features_cache, runs, logs).
@@ -44,119 +44,185 @@ Common failures and fixes:
 
 from __future__ import annotations
 
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-import subprocess
-import sys
-import datetime as dt
+import atexit
+import importlib.util
+import os
+from typing import TYPE_CHECKING
 
-import duckdb
+if TYPE_CHECKING:
+    import duckdb
+
+
+# Bump together with REGISTRY_DDL: a registry already at this version is
+# left alone by _init_duckdb.
+SCHEMA_VERSION = 1
+
+# Registry tables; _init_duckdb runs all of them in one execute.
+REGISTRY_DDL = """
+    CREATE TABLE IF NOT EXISTS meta_schema_version (
+        schema_version INTEGER,
+        applied_at TIMESTAMP
+    );
+    CREATE TABLE IF NOT EXISTS registry_datasets (
+        dataset_id VARCHAR PRIMARY KEY,
+        dataset_type VARCHAR,
+        source_type VARCHAR,
+        spec_json VARCHAR,
+        updated_at TIMESTAMP
+    );
+    CREATE TABLE IF NOT EXISTS registry_instruments (
+        instrument_id VARCHAR PRIMARY KEY,
+        instrument_type VARCHAR,
+        spec_json VARCHAR,
+        updated_at TIMESTAMP
+    );
+    CREATE TABLE IF NOT EXISTS manifest_derived_tables (
+        derived_id VARCHAR,
+        table_name VARCHAR,
+        spec_hash VARCHAR,
+        session VARCHAR,
+        coverage_start TIMESTAMP,
+        coverage_end TIMESTAMP,
+        parquet_path VARCHAR,
+        created_at TIMESTAMP
+    );
+    CREATE TABLE IF NOT EXISTS manifest_feature_cache (
+        feature_hash VARCHAR,
+        feature_id VARCHAR,
+        as_of_date DATE,
+        parquet_path VARCHAR,
+        created_at TIMESTAMP
+    );
+    CREATE TABLE IF NOT EXISTS runs (
+        run_id VARCHAR PRIMARY KEY,
+        run_type VARCHAR,
+        spec_hash VARCHAR,
+        started_at TIMESTAMP,
+        ended_at TIMESTAMP,
+        status VARCHAR,
+        notes VARCHAR
+    );
+    CREATE TABLE IF NOT EXISTS run_metrics (
+        run_id VARCHAR,
+        metric_id VARCHAR,
+        value DOUBLE,
+        created_at TIMESTAMP
+    );
+"""
+
+
+_CON: duckdb.DuckDBPyConnection | None = None
+
+
+def _get_con(db_path: Path) -> duckdb.DuckDBPyConnection:
+    """
+    Process-wide connection to the registry database at db_path, opened on
+    first use and closed at exit. Callers take a cursor() per query batch.
+    """
+    global _CON
+    if _CON is None:
+        # Imported here so loading this module (e.g. for _repo_root) does not
+        # pull in the duckdb extension.
+        import duckdb
+
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        _CON = duckdb.connect(str(db_path))
+        atexit.register(_CON.close)
+    return _CON
 
 
 def _repo_root() -> Path:
     """Return the repository root folder based on this file location."""
-    return Path(__file__).resolve().parents[2]
+    # absolute(), not resolve(): no symlink walk / final-path lookup on disk.
+    return Path(__file__).absolute().parents[2]
+
+
+def _mkdir(p: Path) -> None:
+    p.mkdir(parents=True, exist_ok=True)
 
 
 def _ensure_dirs(paths: list[Path]) -> None:
-    """Create folders if they do not exist."""
+    """
+    Create folders if they do not exist, one depth level at a time; each
+    level's mkdir calls overlap on a small thread pool. Missing parents are
+    created too (two siblings racing to create one is fine with exist_ok).
+    """
+    # One directory listing per parent (siblings share it) instead of a stat
+    # per path; mkdir only for what is missing.
+    subdirs_of: dict[Path, set[str]] = {}
+    by_depth: dict[int, list[Path]] = {}
     for p in paths:
-        p.mkdir(parents=True, exist_ok=True)
+        names = subdirs_of.get(p.parent)
+        if names is None:
+            try:
+                with os.scandir(p.parent) as it:
+                    names = {e.name for e in it if e.is_dir()}
+            except FileNotFoundError:
+                names = set()
+            subdirs_of[p.parent] = names
+        if p.name not in names:
+            by_depth.setdefault(len(p.parts), []).append(p)
+    if not by_depth:
+        return
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        for depth in sorted(by_depth):
+            list(pool.map(_mkdir, by_depth[depth]))
 
 
 def _init_duckdb(db_path: Path) -> None:
     """Create required DuckDB registry tables if they do not exist."""
-    db_path.parent.mkdir(parents=True, exist_ok=True)
-    con = duckdb.connect(str(db_path))
-    con.execute(
-        """
-        CREATE TABLE IF NOT EXISTS meta_schema_version (
-            schema_version INTEGER,
-            applied_at TIMESTAMP
-        )
-        """
-    )
-    con.execute(
-        """
-        CREATE TABLE IF NOT EXISTS registry_datasets (
-            dataset_id VARCHAR PRIMARY KEY,
-            dataset_type VARCHAR,
-            source_type VARCHAR,
-            spec_json VARCHAR,
-            updated_at TIMESTAMP
-        )
-        """
-    )
-    con.execute(
-        """
-        CREATE TABLE IF NOT EXISTS registry_instruments (
-            instrument_id VARCHAR PRIMARY KEY,
-            instrument_type VARCHAR,
-            spec_json VARCHAR,
-            updated_at TIMESTAMP
-        )
-        """
-    )
-    con.execute(
-        """
-        CREATE TABLE IF NOT EXISTS manifest_derived_tables (
-            derived_id VARCHAR,
-            table_name VARCHAR,
-            spec_hash VARCHAR,
-            session VARCHAR,
-            coverage_start TIMESTAMP,
-            coverage_end TIMESTAMP,
-            parquet_path VARCHAR,
-            created_at TIMESTAMP
-        )
-        """
-    )
-    con.execute(
-        """
-        CREATE TABLE IF NOT EXISTS manifest_feature_cache (
-            feature_hash VARCHAR,
-            feature_id VARCHAR,
-            as_of_date DATE,
-            parquet_path VARCHAR,
-            created_at TIMESTAMP
-        )
-        """
-    )
-    con.execute(
-        """
-        CREATE TABLE IF NOT EXISTS runs (
-            run_id VARCHAR PRIMARY KEY,
-            run_type VARCHAR,
-            spec_hash VARCHAR,
-            started_at TIMESTAMP,
-            ended_at TIMESTAMP,
-            status VARCHAR,
-            notes VARCHAR
-        )
-        """
-    )
-    con.execute(
-        """
-        CREATE TABLE IF NOT EXISTS run_metrics (
-            run_id VARCHAR,
-            metric_id VARCHAR,
-            value DOUBLE,
-            created_at TIMESTAMP
-        )
-        """
-    )
+    import duckdb
+
+    con = _get_con(db_path).cursor()
+    try:
+        # Re-bootstrap of a provisioned registry: one lookup, no DDL.
+        try:
+            (version,) = con.execute(
+                "SELECT max(schema_version) FROM meta_schema_version"
+            ).fetchone()
+        except duckdb.CatalogException:
+            version = None
+        if version == SCHEMA_VERSION:
+            return
+
+        # One call for all the DDL, and the version row only goes in if it is
+        # not there yet, so nothing has to be fetched back first. Both commit
+        # together: a failure leaves neither half-created tables nor a
+        # version row claiming they exist.
+        con.begin()
+        try:
+            con.execute(REGISTRY_DDL)
+            con.execute(
+                """
+                INSERT INTO meta_schema_version
+                SELECT $v, current_localtimestamp()
+                WHERE NOT EXISTS (SELECT 1 FROM meta_schema_version WHERE schema_version = $v)
+                """,
+                {"v": SCHEMA_VERSION},
+            )
+            con.commit()
+        except BaseException:
+            con.rollback()
+            raise
+    finally:
+        con.close()
 
-    existing = con.execute("SELECT COUNT(*) FROM meta_schema_version").fetchone()[0]
-    if existing == 0:
-        con.execute(
-            "INSERT INTO meta_schema_version VALUES (?, ?)",
-            [1, dt.datetime.now()],
-        )
-    con.close()
 
+def _run_tool(path: Path) -> None:
+    """
+    Run a tool script's main() in this process and raise if it returns non-zero.
 
-def _run(cmd: list[str]) -> None:
-    """Run a subprocess command and raise on failure."""
-    subprocess.run(cmd, check=True)
+    The script is loaded by file path (tools/ is not a package), which saves a
+    second interpreter start and its openpyxl import per tool.
+    """
+    spec = importlib.util.spec_from_file_location(path.stem, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    rc = module.main()
+    if rc:
+        raise RuntimeError(f"{path.name} failed with exit code {rc}.")
 
 
 def main() -> int:
@@ -178,20 +244,32 @@ def main() -> int:
         data_root / "runs",
         data_root / "logs",
     ]
-    _ensure_dirs(dirs)
-    _init_duckdb(db_path)
-
     repo_root = _repo_root()
-    _run([sys.executable, str(repo_root / "tools" / "verify" / "verify_run_config_xlsx.py")])
-    _run([sys.executable, str(repo_root / "tools" / "admin" / "export_config_snapshot.py")])
+
+    # The workbook check needs neither the folders nor DuckDB, so it runs
+    # alongside them. The export still waits for it: a workbook that fails
+    # verification is never exported.
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        verified = pool.submit(
+            _run_tool, repo_root / "tools" / "verify" / "verify_run_config_xlsx.py"
+        )
+        # mkdir(parents=True) creates the intermediate folders, so only the
+        # leaves need their own call; dirs stays the full list for the report.
+        leaves = [p for p in dirs if not any(p in q.parents for q in dirs)]
+        _ensure_dirs(leaves)
+        _init_duckdb(db_path)
+        verified.result()
+    _run_tool(repo_root / "tools" / "admin" / "export_config_snapshot.py")
 
     latest_snapshot = repo_root / "config" / "exports" / "config_snapshot_latest.json"
 
-    print("Foundation bootstrap complete.")
-    print("Created/verified paths:")
-    for p in dirs:
-        print(f"  {p}")
-    print(f"Latest snapshot: {latest_snapshot}")
+    # One write for the whole report instead of a print per path.
+    print(
+        "Foundation bootstrap complete.\n"
+        "Created/verified paths:\n"
+        + "".join(f"  {p}\n" for p in dirs)
+        + f"Latest snapshot: {latest_snapshot}"
+    )
     return 0
 
 